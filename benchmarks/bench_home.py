@@ -0,0 +1,140 @@
+# benchmarks/bench_home.py — time the stages of a home page rerun on synthetic catalogs
+#   python benchmarks/bench_home.py [--sizes 1000,10000,100000] [--out bench_home.json]
+#   python benchmarks/bench_home.py --save-baseline      # record benchmarks/baseline_home.json
+# Exits 1 when a stage is slower than the baseline by more than --threshold.
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+import data
+from catalog.index import FacetIndex, mask_of
+from catalog.keys import KeyIndex
+from catalog.search import SearchIndex
+from catalog.text import prepare_games
+from home.cards import filter_rows
+from utils.synthetic_utils import synthetic_catalog, GENRES, PLATFORMS
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline_home.json")
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# (name, genres, platforms, keyword, use the BM25 index)
+FILTER_CASES = [
+    ("none", [], [], "", False),
+    ("genre", [GENRES[0]], [], "", False),
+    ("genre+platform", [GENRES[0], GENRES[2]], [PLATFORMS[0]], "", False),
+    ("title_contains", [], [], "dragon", False),
+    ("search", [], [], "zombie co", True),
+    ("genre+search", [GENRES[0]], [PLATFORMS[0]], "space pir", True),
+]
+
+def _time(fn, repeat: int, setup=None) -> dict:
+    runs = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        runs.append((time.perf_counter() - t0) * 1000.0)
+    return {"median_ms": statistics.median(runs), "min_ms": min(runs), "max_ms": max(runs), "repeat": repeat}
+
+def bench_size(n: int, repeat: int, workdir: str) -> dict:
+    path = os.path.join(workdir, f"game_metadata_{n}.csv")
+    synthetic_catalog(n).drop(columns="topic").to_csv(path, index=False)
+    data.GAMES_PATH, data.USE_DB = path, False
+
+    out = {"get_dataset": _time(data.get_dataset, repeat)}
+    raw = data.get_dataset()
+    out["prepare_games"] = _time(prepare_games, repeat, setup=raw.copy)
+    games = prepare_games(raw)
+    out["facet_index"] = _time(lambda: FacetIndex.build(games), repeat)
+    out["search_index"] = _time(lambda: SearchIndex.build(games), repeat)
+    facets, search = FacetIndex.build(games), SearchIndex.build(games)
+
+    def cold_search():
+        search._last = None  # the index memoizes the previous query
+    for name, genres, plats, kw, use_search in FILTER_CASES:
+        idx = search if use_search else None
+        out[f"filter[{name}]"] = _time(
+            lambda _: filter_rows(games, facets, genres, plats, kw, search=idx), repeat, setup=cold_search)
+        base = mask_of(search.search(kw), facets.n_rows) if use_search else None
+        out[f"facet_counts[{name}]"] = _time(lambda: facets.facet_counts(genres, plats, base), repeat)
+    out["key_index"] = _time(lambda: KeyIndex.build(games), repeat)
+    keys = KeyIndex.build(games)
+    out["seed_titles"] = _time(keys.seed_labels, repeat)
+    probe = games["id"].iat[len(games) // 2]
+    out["detail_lookup"] = _time(lambda: keys.row_of(probe), repeat)
+    return out
+
+def compare(current: dict, baseline: dict, threshold: float, min_ms: float) -> list[dict]:
+    """Per-stage best-of-N ratios (the minimum is least sensitive to machine noise)."""
+    rows = []
+    for size, stages in current["results"].items():
+        base = baseline.get("results", {}).get(size, {})
+        for stage, m in stages.items():
+            if stage not in base:
+                continue
+            was, now = base[stage]["min_ms"], m["min_ms"]
+            ratio = now / max(was, 1e-6)
+            rows.append({"size": int(size), "stage": stage, "baseline_ms": was, "current_ms": now,
+                         "ratio": ratio, "regression": ratio > threshold and now - was > min_ms})
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for the home page hot paths.")
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated catalog sizes")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", default=None, help="write results (and the comparison) as JSON")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    ap.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio that counts as a regression")
+    ap.add_argument("--min-ms", type=float, default=1.0, help="ignore slowdowns smaller than this many ms")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {
+        "created_at": time.time(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count(), "numpy": np.__version__, "pandas": pd.__version__},
+        "repeat": args.repeat,
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            t0 = time.perf_counter()
+            report["results"][str(n)] = res = bench_size(n, args.repeat, workdir)
+            print(f"{n:>9,} games ({time.perf_counter() - t0:.1f}s)")
+            for stage, m in res.items():
+                print(f"    {stage:32s} {m['median_ms']:10.2f} ms  (min {m['min_ms']:.2f})")
+
+    failed = False
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            rows = compare(report, json.load(f), args.threshold, args.min_ms)
+        report["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "stages": rows}
+        slow = [r for r in rows if r["regression"]]
+        print(f"\nvs baseline: {len(rows)} stages compared, {len(slow)} slower than {args.threshold:.2f}x")
+        for r in slow:
+            print(f"    {r['size']:>9,} {r['stage']:32s} {r['baseline_ms']:.2f} -> {r['current_ms']:.2f} ms "
+                  f"({r['ratio']:.2f}x)")
+        failed = bool(slow)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline -> {args.baseline}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+# build_cb_index.py — fit the content-based TF-IDF index offline
+#   python build_cb_index.py [--out models/cb_index] [--text-col combined_text] [--neighbors 50] [--ann]
+import argparse
+import time
+import numpy as np
+
+from catalog import get_catalog
+from utils.ann_utils import IVFIndex, DEFAULT_DIM, DEFAULT_NPROBE
+from utils.similarity_utils import DEFAULT_MEMORY_MB
+from utils.recommender_utils import (
+    NEIGHBOR_K, build_cb_index, save_cb_index, build_neighbor_table, score_cb_batch,
+)
+
+CB_INDEX_PATH = "models/cb_index"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the CB recommendation artifact from the game catalog.")
+    ap.add_argument("--out", default=CB_INDEX_PATH, help="artifact directory")
+    ap.add_argument("--text-col", default="combined_text")
+    ap.add_argument("--min-df", type=int, default=2)
+    ap.add_argument("--max-df", type=float, default=0.95)
+    ap.add_argument("--neighbors", type=int, default=NEIGHBOR_K, help="neighbours kept per game (0 = skip the table)")
+    ap.add_argument("--neighbor-dtype", choices=("float16", "float32"), default="float16")
+    ap.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="similarity block budget per worker")
+    ap.add_argument("--jobs", type=int, default=1, help="worker processes for the neighbour table")
+    ap.add_argument("--ann", action="store_true", help="also build the IVF approximate-neighbour index")
+    ap.add_argument("--ann-dim", type=int, default=DEFAULT_DIM)
+    ap.add_argument("--ann-lists", type=int, default=None, help="IVF buckets (default 4*sqrt(n))")
+    ap.add_argument("--ann-nprobe", type=int, default=DEFAULT_NPROBE, help="buckets scanned per query (recall vs latency)")
+    ap.add_argument("--ann-verify", type=int, default=200, help="seeds checked against exact TF-IDF search (0 = skip)")
+    args = ap.parse_args(argv)
+
+    catalog = get_catalog()
+    if catalog.empty:
+        print("No game data found.")
+        return 1
+    t0 = time.perf_counter()
+    index = build_cb_index(catalog.columns("id", "title", args.text_col), args.text_col,
+                           min_df=args.min_df, max_df=args.max_df)
+    X = index["matrix"]
+    print(f"Fitted TF-IDF for {X.shape[0]} games x {X.shape[1]} terms "
+          f"(catalog {index['catalog_fingerprint']}) in {time.perf_counter() - t0:.1f}s")
+
+    table = None
+    if args.neighbors > 0:
+        t0 = time.perf_counter()
+        table = build_neighbor_table(index, args.neighbors, np.dtype(args.neighbor_dtype),
+                                     memory_mb=args.memory_mb, n_jobs=args.jobs)
+        print(f"Built top-{table.k} neighbour table in {time.perf_counter() - t0:.1f}s")
+
+    ann = None
+    if args.ann:
+        t0 = time.perf_counter()
+        ann = IVFIndex.build(X, dim=args.ann_dim, n_lists=args.ann_lists, fingerprint=index["catalog_fingerprint"])
+        ann.meta["nprobe"] = args.ann_nprobe
+        print(f"Built IVF index ({ann.n_lists} lists, dim {ann.meta['dim']}) in {time.perf_counter() - t0:.1f}s")
+        if args.ann_verify > 0:
+            seeds = np.random.default_rng(0).choice(ann.n_rows, min(args.ann_verify, ann.n_rows), replace=False)
+            truth, _ = score_cb_batch(index, seeds, 10)
+            print(f"recall@10 vs exact TF-IDF: {ann.recall(seeds, 10, truth=truth):.3f} "
+                  f"(vs exact reduced vectors: {ann.recall(seeds, 10):.3f})")
+
+    manifest = save_cb_index(index, args.out, neighbors=table, ann=ann)
+    print(f"Wrote artifact {manifest['build_id']} -> {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
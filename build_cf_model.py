@@ -0,0 +1,43 @@
+# build_cf_model.py — train the collaborative-filtering ALS model offline from game_ratings
+#   python build_cf_model.py [--out models/cf_als] [--factors 32] [--iters 10] [--reg 0.05]
+import argparse
+import time
+
+from data import load_ratings
+from utils.cf_utils import ALSModel, DEFAULT_FACTORS, DEFAULT_REG, DEFAULT_ITERS, DEFAULT_CG_STEPS, DEFAULT_MEMORY_MB
+from utils.recommender_utils import save_cf_model
+
+CF_MODEL_PATH = "models/cf_als"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Train the CF recommendation artifact from game_ratings.")
+    ap.add_argument("--out", default=CF_MODEL_PATH, help="artifact directory")
+    ap.add_argument("--factors", type=int, default=DEFAULT_FACTORS)
+    ap.add_argument("--reg", type=float, default=DEFAULT_REG, help="L2 penalty, scaled by each row's rating count")
+    ap.add_argument("--iters", type=int, default=DEFAULT_ITERS)
+    ap.add_argument("--cg-steps", type=int, default=DEFAULT_CG_STEPS, help="conjugate-gradient steps per ALS half-sweep")
+    ap.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="working memory per solve batch")
+    ap.add_argument("--nrows", type=int, default=None, help="only read the first N ratings")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    ratings = load_ratings(args.nrows)
+    if ratings.empty:
+        print("No ratings found.")
+        return 1
+    print(f"Loaded {len(ratings):,} ratings in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    model = ALSModel.build(ratings, factors=args.factors, reg=args.reg, iters=args.iters, cg_steps=args.cg_steps,
+                           seed=args.seed, memory_mb=args.memory_mb, verbose=True)
+    m = model.meta
+    print(f"Trained ALS on {m['n_users']:,} users x {m['n_items']:,} games "
+          f"(train RMSE {m['train_rmse']:.4f}) in {time.perf_counter() - t0:.1f}s")
+
+    manifest = save_cf_model(model, args.out)
+    print(f"Wrote artifact {manifest['build_id']} -> {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,3 @@
+from .snapshot import CatalogSnapshot, get_catalog, invalidate_catalog
+
+__all__ = ["CatalogSnapshot", "get_catalog", "invalidate_catalog"]
@@ -0,0 +1,212 @@
+# catalog/compact.py — compact per-process catalog: narrow dtypes, interned facets, one shared text buffer
+#
+# Held per worker process for the lifetime of a catalog version. Everything the
+# filters scan stays columnar (int32 ids, titles, multi-hot facets); long text
+# (descriptions, URLs) is one utf-8 buffer decoded only for the rows on a page.
+# Built from a store build (catalog/store.py), every array is a read-only mmap,
+# so all worker processes on a host share the same pages.
+from __future__ import annotations
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .index import split_tokens
+from .text import card_snippet
+
+BUFFER_COLUMNS = ("description_clean", "cover_image", "game_link")
+FACET_COLUMNS = ("genres", "platforms")
+# what rows() hands to the card / detail renderers
+DISPLAY_COLUMNS = ("id", "title", "genres", "platforms", "cover_image", "description_clean",
+                   "description_snippet", "rating", "released", "game_link")
+
+def encode_text(s: pd.Series):
+    null = s.isna().to_numpy()
+    enc = [b"" if n else str(v).encode("utf-8", "ignore") for v, n in zip(s.to_numpy(dtype=object), null)]
+    offsets = np.zeros(len(enc) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, enc), dtype=np.int64, count=len(enc)), out=offsets[1:])
+    buf = np.frombuffer(b"".join(enc), dtype=np.uint8)
+    return buf, offsets, null
+
+def decode_text(buf: np.ndarray, offsets: np.ndarray, rows=None) -> list[str]:
+    """Decode rows (all by default) of a text buffer without touching the rest."""
+    if rows is None:
+        raw = buf.tobytes()
+        off = offsets.tolist()
+        return [raw[a:b].decode("utf-8", "ignore") for a, b in zip(off[:-1], off[1:])]
+    starts, ends = offsets[rows].tolist(), offsets[np.asarray(rows) + 1].tolist()
+    return [buf[a:b].tobytes().decode("utf-8", "ignore") for a, b in zip(starts, ends)]
+
+class Facet:
+    """Multi-hot (rows x vocabulary) CSR matrix over interned tokens.
+
+    Each row keeps its tokens in their original order, so joining the labels
+    reproduces the "a, b, c" cell for display.
+    """
+
+    def __init__(self, matrix: sparse.csr_matrix, labels: list[str]):
+        self.matrix = matrix
+        self.labels = labels
+        self._labels = np.asarray(labels, dtype=object)
+
+    @classmethod
+    def build(cls, series: pd.Series) -> "Facet":
+        n = len(series)
+        rows, toks = split_tokens(series)
+        # interned as written ("action" and "Action" are two labels) so cells display unchanged;
+        # case folding for filters happens in TokenIndex.from_facet
+        codes, labels = pd.factorize(toks)
+        # int32 indices and indptr: scipy keeps them as-is, so mmapped parts are not copied
+        indptr = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        matrix = sparse.csr_matrix((np.ones(len(codes), dtype=bool), codes.astype(np.int32), indptr),
+                                   shape=(n, len(labels)))
+        return cls(matrix, labels.tolist())
+
+    def entries(self) -> tuple[np.ndarray, np.ndarray]:
+        """(row position, token code) of every non-zero, in row order."""
+        m = self.matrix
+        return np.repeat(np.arange(m.shape[0], dtype=np.int64), np.diff(m.indptr)), m.indices.astype(np.int64)
+
+    def strings(self, rows: Optional[np.ndarray] = None) -> list[str]:
+        m = self.matrix
+        rows = range(m.shape[0]) if rows is None else rows
+        indptr, indices, labels = m.indptr, m.indices, self._labels
+        return [", ".join(labels[indices[indptr[r]:indptr[r + 1]]]) for r in rows]
+
+def _narrow_ids(ids: pd.Series) -> np.ndarray:
+    values = pd.to_numeric(ids, errors="coerce").fillna(-1).astype(np.int64).to_numpy()
+    fits = not len(values) or (values.min() >= np.iinfo(np.int32).min and values.max() <= np.iinfo(np.int32).max)
+    return values.astype(np.int32) if fits else values
+
+class CompactCatalog:
+    def __init__(self, ids: np.ndarray, titles: np.ndarray, facets: dict, rating: np.ndarray,
+                 released: np.ndarray, buf: np.ndarray, offsets: dict, released_raw: Optional[tuple] = None):
+        self.ids = ids
+        self.titles = titles
+        self.facets = facets
+        self.rating = rating
+        self.released = released
+        # (rows, utf-8 buffer, offsets) of release values that are not plain ISO dates ("TBA", "2013", "Sep 17, 2013"),
+        # shown verbatim instead of a reformatted or blank date
+        self.released_raw = released_raw or (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.uint8),
+                                             np.zeros(1, dtype=np.int64))
+        self.buf = buf
+        self.offsets = offsets
+        self.n_rows = len(ids)
+
+    @classmethod
+    def from_frame(cls, games: pd.DataFrame) -> "CompactCatalog":
+        """Compact a prepare_games() frame; the frame can be dropped afterwards."""
+        parts, offsets, start = [], {}, 0
+        for c in BUFFER_COLUMNS:
+            buf, off, _ = encode_text(games[c].fillna("").astype(str))
+            parts.append(buf)
+            offsets[c] = off + start
+            start += len(buf)
+        raw = games["released"].fillna("").astype(str)
+        released = pd.to_datetime(raw.mask(raw == ""), errors="coerce", format="ISO8601")
+        other = np.flatnonzero((released.dt.strftime("%Y-%m-%d").fillna("") != raw).to_numpy())
+        other_buf, other_offsets, _ = encode_text(raw.iloc[other])
+        return cls(
+            ids=_narrow_ids(games["id"]),
+            titles=games["title"].fillna("").astype(str).to_numpy(dtype=object),
+            facets={c: Facet.build(games[c]) for c in FACET_COLUMNS},
+            rating=pd.to_numeric(games["rating"], errors="coerce").to_numpy(dtype=np.float32),
+            released=released.to_numpy(dtype="datetime64[ns]"),
+            buf=np.concatenate(parts) if parts else np.empty(0, dtype=np.uint8),
+            offsets=offsets,
+            released_raw=(other.astype(np.int32), other_buf, other_offsets),
+        )
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        titles, title_offsets, _ = encode_text(pd.Series(self.titles, dtype=object))
+        raw_rows, raw_buf, raw_offsets = self.released_raw
+        out = {"ids": self.ids, "rating": self.rating, "released": self.released, "buf": self.buf,
+               "titles.bytes": titles, "titles.offsets": title_offsets,
+               "released_raw.rows": raw_rows, "released_raw.bytes": raw_buf, "released_raw.offsets": raw_offsets}
+        out.update({f"offsets.{c}": o for c, o in self.offsets.items()})
+        for c, f in self.facets.items():
+            out.update({f"{c}.data": f.matrix.data, f"{c}.indices": f.matrix.indices, f"{c}.indptr": f.matrix.indptr})
+        return out
+
+    def meta(self) -> dict:
+        return {"rows": self.n_rows, "text_columns": list(self.offsets),
+                "facets": {c: {"labels": f.labels} for c, f in self.facets.items()}}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, meta: dict) -> "CompactCatalog":
+        """Wrap stored arrays without copying; only titles are decoded (they are scanned as strings)."""
+        n = meta["rows"]
+        facets = {}
+        for c, info in meta["facets"].items():
+            parts = (arrays[f"{c}.data"], arrays[f"{c}.indices"], arrays[f"{c}.indptr"])
+            matrix = sparse.csr_matrix(parts, shape=(n, len(info["labels"])), copy=False)
+            facets[c] = Facet(matrix, info["labels"])
+        return cls(
+            ids=arrays["ids"],
+            titles=np.array(decode_text(arrays["titles.bytes"], arrays["titles.offsets"]), dtype=object),
+            facets=facets,
+            rating=arrays["rating"],
+            released=arrays["released"],
+            buf=arrays["buf"],
+            offsets={c: arrays[f"offsets.{c}"] for c in meta["text_columns"]},
+            released_raw=(arrays["released_raw.rows"], arrays["released_raw.bytes"], arrays["released_raw.offsets"]),
+        )
+
+    def keys(self) -> pd.DataFrame:
+        """The columns every filter and recommender works on; row position is the shared key."""
+        return pd.DataFrame({"id": self.ids, "title": self.titles}, copy=False)
+
+    def _text(self, col: str, rows: Optional[np.ndarray]) -> list[str]:
+        return decode_text(self.buf, self.offsets[col], rows)
+
+    def column(self, name: str, rows: Optional[np.ndarray] = None):
+        """One column as the legacy prepare_games() frame had it (all rows by default)."""
+        pick = (lambda a: a) if rows is None else (lambda a: a[rows])
+        if name == "id":
+            return pick(self.ids)
+        if name == "title":
+            return pick(self.titles)
+        if name in self.facets:
+            return self.facets[name].strings(rows)
+        if name in self.offsets:
+            return self._text(name, rows)
+        if name == "description_snippet":
+            return card_snippet(pd.Series(self._text("description_clean", rows), dtype=object)).to_numpy()
+        if name == "combined_text":
+            text = pd.Series(self.facets["genres"].strings(rows), dtype=object) + " " + \
+                pd.Series(self._text("description_clean", rows), dtype=object)
+            return text.str.strip().to_numpy()
+        if name == "rating":
+            return pick(self.rating).astype(np.float64).round(4)   # float32 -> display-friendly float
+        if name == "released":
+            return self._released(rows)
+        raise KeyError(name)
+
+    def _released(self, rows: Optional[np.ndarray]) -> np.ndarray:
+        rows = np.arange(self.n_rows) if rows is None else np.asarray(rows, dtype=np.int64)
+        out = pd.Series(self.released[rows]).dt.strftime("%Y-%m-%d").fillna("").to_numpy(dtype=object)
+        raw_rows, raw_buf, raw_offsets = self.released_raw
+        if len(raw_rows) and len(rows):
+            at = np.minimum(np.searchsorted(raw_rows, rows), len(raw_rows) - 1)
+            hit = np.flatnonzero(raw_rows[at] == rows)
+            out[hit] = decode_text(raw_buf, raw_offsets, at[hit])
+        return out
+
+    def frame(self, columns: Iterable[str] = DISPLAY_COLUMNS, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Materialize columns for `rows` (all rows by default); the index holds row positions."""
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+        index = pd.RangeIndex(self.n_rows) if rows is None else pd.Index(rows)
+        return pd.DataFrame({c: self.column(c, rows) for c in columns}, index=index)
+
+    def nbytes(self) -> int:
+        """Approximate resident size, Python string objects included."""
+        total = self.ids.nbytes + self.rating.nbytes + self.released.nbytes + self.buf.nbytes
+        total += sum(a.nbytes for a in self.released_raw)
+        total += sum(o.nbytes for o in self.offsets.values())
+        total += sum(f.matrix.data.nbytes + f.matrix.indices.nbytes + f.matrix.indptr.nbytes
+                     for f in self.facets.values())
+        total += int(pd.Series(self.titles).memory_usage(deep=True))
+        return int(total)
@@ -0,0 +1,105 @@
+# catalog/index.py — inverted bitmap index over comma-separated facet columns
+from __future__ import annotations
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+def split_tokens(series: pd.Series) -> tuple[np.ndarray, pd.Series]:
+    """Explode "a, b, c" cells into (row positions, stripped tokens)."""
+    s = pd.Series(series.fillna("").astype(str).to_numpy())
+    toks = s.str.split(",").explode().str.strip()
+    toks = toks[toks.notna() & (toks != "")]
+    return toks.index.to_numpy(dtype=np.int64), toks.reset_index(drop=True)
+
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+def rows_of(mask: np.ndarray, n_rows: int) -> np.ndarray:
+    return np.flatnonzero(np.unpackbits(mask, count=n_rows))
+
+def full_mask(n_rows: int) -> np.ndarray:
+    return np.packbits(np.ones(n_rows, dtype=bool))
+
+def mask_of(rows: np.ndarray, n_rows: int) -> np.ndarray:
+    m = np.zeros(n_rows, dtype=bool)
+    m[rows] = True
+    return np.packbits(m)
+
+class TokenIndex:
+    """One packed bitmap (n_rows bits) per normalized token of a column."""
+
+    def __init__(self, keys: list[str], labels: list[str], bitmaps: np.ndarray, n_rows: int):
+        self.keys = keys
+        self.labels = labels
+        self.bitmaps = bitmaps
+        self.n_rows = n_rows
+        self._pos = {k: i for i, k in enumerate(keys)}
+        self.vocab = sorted(labels)
+
+    @classmethod
+    def build(cls, series: pd.Series) -> "TokenIndex":
+        rows, toks = split_tokens(series)
+        codes, keys = pd.factorize(toks.str.lower())
+        labels = toks.groupby(codes).first().tolist()
+        return cls._from_codes(rows, codes, keys.tolist(), labels, len(series))
+
+    @classmethod
+    def from_facet(cls, facet) -> "TokenIndex":
+        """Bitmaps straight from an interned catalog.compact.Facet (no re-tokenizing)."""
+        rows, codes = facet.entries()
+        # fold the facet's exact-case labels onto case-folded keys, first spelling wins as in build()
+        fold, keys = pd.factorize(pd.Series(facet.labels, dtype=object).str.lower())
+        labels = pd.Series(facet.labels, dtype=object).groupby(fold).first().tolist()
+        return cls._from_codes(rows, fold[codes], keys.tolist(), labels, facet.matrix.shape[0])
+
+    @classmethod
+    def _from_codes(cls, rows, codes, keys: list[str], labels: list[str], n: int) -> "TokenIndex":
+        bitmaps = np.zeros((len(keys), (n + 7) // 8), dtype=np.uint8)
+        bit = np.left_shift(1, 7 - (rows & 7)).astype(np.uint8)
+        np.bitwise_or.at(bitmaps, (codes, rows >> 3), bit)
+        return cls(keys, labels, bitmaps, n)
+
+    def vocabulary(self) -> list[str]:
+        return self.vocab
+
+    def counts(self, mask: np.ndarray) -> dict[str, int]:
+        """Rows inside `mask` carrying each token, keyed by display label."""
+        n = _POPCOUNT[np.bitwise_and(self.bitmaps, mask)].sum(axis=1, dtype=np.int64)
+        return dict(zip(self.labels, n.tolist()))
+
+    def any_of(self, tokens: Iterable[str]) -> np.ndarray:
+        pos = [self._pos[k] for k in {t.strip().lower() for t in tokens} if k in self._pos]
+        if not pos:
+            return np.zeros(self.bitmaps.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bitmaps[pos], axis=0)
+
+class FacetIndex:
+    def __init__(self, genres: TokenIndex, platforms: TokenIndex, n_rows: int):
+        self.genres = genres
+        self.platforms = platforms
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, games: pd.DataFrame) -> "FacetIndex":
+        return cls(TokenIndex.build(games["genres"]), TokenIndex.build(games["platforms"]), len(games))
+
+    @classmethod
+    def from_compact(cls, compact) -> "FacetIndex":
+        f = compact.facets
+        return cls(TokenIndex.from_facet(f["genres"]), TokenIndex.from_facet(f["platforms"]), compact.n_rows)
+
+    def mask(self, genres: list[str], plats: list[str]) -> np.ndarray:
+        """OR within a facet, AND across facets — same semantics as the old row filter."""
+        m = full_mask(self.n_rows)
+        if genres:
+            m &= self.genres.any_of(genres)
+        if plats:
+            m &= self.platforms.any_of(plats)
+        return m
+
+    def facet_counts(self, genres: list[str], plats: list[str], base: np.ndarray | None = None):
+        """Live (genre, platform) counts. Each facet ignores its own selection,
+        so picking "Action" still shows how many games the other genres add."""
+        base = full_mask(self.n_rows) if base is None else base
+        g_base = base & self.platforms.any_of(plats) if plats else base
+        p_base = base & self.genres.any_of(genres) if genres else base
+        return self.genres.counts(g_base), self.platforms.counts(p_base)
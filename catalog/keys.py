@@ -0,0 +1,77 @@
+# catalog/keys.py — hashed id / title -> row position lookups, built once per catalog version
+from __future__ import annotations
+import unicodedata
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+
+def normalize_title(title) -> str:
+    """NFKC, case-folded, whitespace collapsed: "  Half-Life  2" and "half-life 2" are one key."""
+    return " ".join(unicodedata.normalize("NFKC", title).casefold().split()) if isinstance(title, str) else ""
+
+class KeyIndex:
+    """Row positions (never index labels) by game id and by normalized title.
+
+    Several games may share a title: title_rows() returns all of them in
+    catalog order, title_row() the first. seed_labels() disambiguates such
+    titles as "Title (#id)" so every choice maps back to exactly one row.
+    """
+
+    def __init__(self, ids: np.ndarray, titles: np.ndarray):
+        self.n_rows = len(ids)
+        id_keys = pd.Series(ids, dtype=object).astype(str).str.strip()
+        first = ~id_keys.duplicated().to_numpy()     # a repeated id resolves to its first row
+        self._ids = pd.Index(id_keys[first].to_numpy())
+        self._id_rows = np.flatnonzero(first)
+        raw_codes, raw_uniques = pd.factorize(np.asarray(titles, dtype=object))
+        # normalize each distinct title once, then re-factorize the normalized keys
+        norm_codes, uniques = pd.factorize(np.array([normalize_title(t) for t in raw_uniques] + [""], dtype=object))
+        codes = norm_codes[raw_codes]   # raw code -1 (missing) picks the trailing ""
+        self._titles = pd.Index(uniques)
+        self._order = np.argsort(codes, kind="stable")
+        self._starts = np.searchsorted(codes[self._order], np.arange(len(uniques) + 1))
+        counts = np.diff(self._starts)
+        raw = pd.Series(titles, dtype=object).fillna("").astype(str).str.strip()
+        dup = np.flatnonzero((counts[codes] > 1) & (raw != "").to_numpy())
+        labels = raw.to_numpy(dtype=object).copy()
+        labels[dup] = (raw.iloc[dup] + " (#" + id_keys.iloc[dup] + ")").to_numpy()
+        self.labels = labels
+        self.duplicate_titles = len(np.unique(codes[dup]))
+        self._by_label = dict(zip(labels[dup].tolist(), dup.tolist()))
+
+    @classmethod
+    def build(cls, games: pd.DataFrame) -> "KeyIndex":
+        return cls(games["id"].to_numpy(), games["title"].to_numpy())
+
+    def rows_of(self, ids: Iterable) -> np.ndarray:
+        """Row positions of game ids (str or int); -1 where absent."""
+        keys = pd.Series(list(ids), dtype=object).astype(str).str.strip().to_numpy()
+        pos = self._ids.get_indexer(keys)
+        return np.where(pos >= 0, self._id_rows[pos], -1)
+
+    def row_of(self, gid) -> int:
+        try:
+            return int(self._id_rows[self._ids.get_loc(str(gid).strip())])
+        except KeyError:
+            return -1
+
+    def title_rows(self, title: str) -> np.ndarray:
+        try:
+            code = self._titles.get_loc(normalize_title(title))
+        except KeyError:
+            return np.empty(0, dtype=np.int64)
+        return self._order[self._starts[code]:self._starts[code + 1]]
+
+    def title_row(self, title: str) -> Optional[int]:
+        """One row for a seed label or title; the first in catalog order when the title repeats."""
+        if not isinstance(title, str) or not title.strip():
+            return None
+        if title in self._by_label:
+            return self._by_label[title]
+        rows = self.title_rows(title)
+        return int(rows[0]) if len(rows) else None
+
+    def seed_labels(self) -> list[str]:
+        """Sorted selectbox options, one per game, duplicate titles suffixed with their id."""
+        labels = pd.unique(self.labels)
+        return sorted(labels[labels != ""].tolist())
@@ -0,0 +1,126 @@
+# catalog/search.py — BM25 full-text search over title + description_clean
+from __future__ import annotations
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+TOKEN_RE = re.compile(r"(?u)\b\w+\b")
+TITLE_WEIGHT = 2.0
+K1 = 1.2
+B = 0.75
+MAX_EXPANSIONS = 64
+PREFIX_WEIGHT = 0.8
+SUBSTRING_SCORE = 1e-6
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+class SearchIndex:
+    """Inverted index with precomputed BM25F term weights (one CSC column per term).
+
+    Titles count TITLE_WEIGHT times towards term frequency and length. The
+    last query token is also matched as a prefix so results update while
+    the user is still typing. Titles that merely contain the query text
+    ("craft" in "Minecraft") are appended after the ranked matches.
+    """
+
+    def __init__(self, terms: np.ndarray, doc_freq: np.ndarray, weights: sparse.csc_matrix,
+                 titles: np.ndarray | None = None):
+        self.terms = terms
+        self.doc_freq = doc_freq
+        self.weights = weights
+        self._blob, self._starts = "", np.zeros(1, dtype=np.int64)
+        if titles is not None:
+            # one lower-cased string of all titles: str.find scans it at C speed
+            lowered = [str(t).lower().replace("\n", " ") for t in titles]
+            self._blob = "\n".join(lowered)
+            self._starts = np.cumsum([0] + [len(t) + 1 for t in lowered], dtype=np.int64)
+        self.n_rows = weights.shape[0]
+        self._last: tuple[str, np.ndarray] | None = None
+
+    @classmethod
+    def build(cls, games: pd.DataFrame) -> "SearchIndex":
+        from sklearn.feature_extraction.text import CountVectorizer
+        n = len(games)
+        titles = games["title"].fillna("").astype(str)
+        descs = games["description_clean"].fillna("").astype(str)
+        vec = CountVectorizer(token_pattern=TOKEN_RE.pattern, lowercase=True, dtype=np.float32)
+        X = vec.fit_transform(pd.concat([titles, descs], ignore_index=True)).tocsr()
+        tf = (X[:n] * TITLE_WEIGHT + X[n:]).tocsr()
+        dl = np.asarray(tf.sum(axis=1)).ravel()
+        avgdl = float(dl.mean()) if n and dl.mean() > 0 else 1.0
+        df = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        row_len = np.repeat(dl, np.diff(tf.indptr))
+        norm = K1 * (1.0 - B + B * row_len / avgdl)
+        tf.data = idf[tf.indices] * tf.data * (K1 + 1.0) / (tf.data + norm)
+        terms = np.asarray(vec.get_feature_names_out(), dtype=object)
+        return cls(terms, df, tf.astype(np.float32).tocsc(), titles.to_numpy(dtype=object))
+
+    def _exact(self, tok: str) -> int:
+        i = int(np.searchsorted(self.terms, tok))
+        return i if i < len(self.terms) and self.terms[i] == tok else -1
+
+    def _prefix(self, tok: str) -> np.ndarray:
+        lo = int(np.searchsorted(self.terms, tok))
+        hi = int(np.searchsorted(self.terms, tok + "\uffff"))
+        cols = np.arange(lo, hi)
+        if len(cols) > MAX_EXPANSIONS:
+            cols = cols[np.argsort(-self.doc_freq[cols], kind="stable")[:MAX_EXPANSIONS]]
+        return cols
+
+    def score(self, query: str) -> np.ndarray:
+        last = self._last
+        if last is not None and last[0] == query:
+            return last[1]
+        scores = self._score(query)
+        hit = self._title_hits(query.strip().lower())
+        # below every BM25 score, so substring-only hits follow in catalog order
+        scores[hit[scores[hit] == 0]] = SUBSTRING_SCORE
+        self._last = (query, scores)
+        return scores
+
+    def _title_hits(self, needle: str) -> np.ndarray:
+        """Rows whose (lower-cased) title contains `needle`."""
+        if not needle or "\n" in needle:
+            return np.empty(0, dtype=np.int64)
+        # match offsets come from the C regex scan; one searchsorted maps them all to rows
+        pos = np.fromiter((m.start() for m in re.finditer(re.escape(needle), self._blob)), dtype=np.int64)
+        return np.unique(np.searchsorted(self._starts, pos, side="right") - 1)
+
+    def _column(self, col: int) -> tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.weights.indptr[col], self.weights.indptr[col + 1]
+        return self.weights.indices[lo:hi], self.weights.data[lo:hi]
+
+    def _score(self, query: str) -> np.ndarray:
+        scores = np.zeros(self.n_rows, dtype=np.float32)
+        toks = tokenize(query)
+        if not toks or not len(self.terms):
+            return scores
+        *head, last = toks
+        for c in dict.fromkeys(self._exact(t) for t in head):
+            if c >= 0:
+                rows, w = self._column(c)
+                scores[rows] += w
+        # last token: its exact weight, or the best prefix expansion at PREFIX_WEIGHT
+        # (rows within one CSC column are unique, so plain fancy indexing is safe)
+        last_col = self._exact(last)
+        best = np.zeros(self.n_rows, dtype=np.float32)
+        for c in self._prefix(last):
+            if c != last_col:
+                rows, w = self._column(c)
+                best[rows] = np.maximum(best[rows], PREFIX_WEIGHT * w)
+        if last_col >= 0:
+            rows, w = self._column(last_col)
+            best[rows] = np.maximum(best[rows], w)
+        return scores + best
+
+    def search(self, query: str, rows: np.ndarray | None = None) -> np.ndarray:
+        """Matching row positions (optionally restricted to `rows`), best first."""
+        scores = self.score(query)
+        if rows is None:
+            rows = np.flatnonzero(scores > 0)
+        else:
+            rows = rows[scores[rows] > 0]
+        return rows[np.argsort(-scores[rows], kind="stable")]
@@ -0,0 +1,112 @@
+# catalog/snapshot.py — process-wide, versioned, read-only game catalog
+from __future__ import annotations
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+import pandas as pd
+
+import data
+from . import store
+from .compact import DISPLAY_COLUMNS, CompactCatalog
+from .keys import KeyIndex
+from .text import prepare_games
+
+CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "30"))
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One catalog version. `games` is the lean (id, title) frame whose row
+    positions every index and recommender shares; display columns come from
+    `compact` only for the rows actually shown."""
+    version: str
+    compact: CompactCatalog
+    games: pd.DataFrame
+    loaded_at: float
+    _derived: dict = field(default_factory=dict, repr=False, compare=False)
+    # reentrant: a build may itself read another derived structure (seed_titles -> keys)
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+
+    @property
+    def empty(self) -> bool:
+        return self.games.empty
+
+    @property
+    def keys(self) -> KeyIndex:
+        """id / title -> row position lookups for this version."""
+        return self.derived("keys", KeyIndex.build)
+
+    def rows(self, positions: Iterable[int]) -> pd.DataFrame:
+        """Display columns for a page of row positions (index = positions)."""
+        return self.compact.frame(rows=positions)
+
+    def hydrate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Display columns for a lean result frame, keeping its extra columns (scores...)."""
+        if df is None or df.empty:
+            return df
+        full = self.rows(df.index.to_numpy())
+        extra = [c for c in df.columns if c not in full.columns]
+        return full.join(df[extra]) if extra else full
+
+    def columns(self, *names: str) -> pd.DataFrame:
+        """Materialize whole columns (all of DISPLAY_COLUMNS + combined_text by default).
+
+        Meant for offline jobs and one-off index builds; the result is not kept.
+        """
+        return self.compact.frame(names or DISPLAY_COLUMNS + ("combined_text",))
+
+    def derived(self, name: str, build: Callable[[pd.DataFrame], Any], columns: tuple = ()) -> Any:
+        """Build (once) and return a structure tied to this catalog version.
+
+        `build` gets the lean games frame, or just `columns` materialized for the build.
+        """
+        cache = self._derived
+        if name not in cache:
+            with self._lock:
+                if name not in cache:
+                    cache[name] = build(self.columns(*columns) if columns else self.games)
+        return cache[name]
+
+_current: Optional[CatalogSnapshot] = None
+_checked_at = 0.0
+_reload_lock = threading.Lock()
+
+def _load_snapshot(version: str) -> CatalogSnapshot:
+    compact = store.read_store(version)
+    if compact is None:
+        compact = CompactCatalog.from_frame(prepare_games(data.load_games()))
+        # re-open what was just written so this process maps the same pages as the others
+        if compact.n_rows and store.write_store(compact, version):
+            compact = store.read_store(version) or compact
+    return CatalogSnapshot(version=version, compact=compact, games=compact.keys(), loaded_at=time.time())
+
+def get_catalog() -> CatalogSnapshot:
+    """Return the shared snapshot, reloading only when the source version changes.
+
+    The returned snapshot is shared by every session: treat it as read-only.
+    While one thread reloads, the others keep serving the previous snapshot.
+    """
+    global _current, _checked_at
+    snap = _current
+    if snap is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+        return snap
+    if not _reload_lock.acquire(blocking=snap is None):
+        return snap
+    try:
+        snap = _current
+        if snap is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+            return snap
+        version = data.source_version()
+        if snap is None or snap.version != version:
+            snap = _load_snapshot(version)
+            _current = snap
+        _checked_at = time.monotonic()
+        return snap
+    finally:
+        _reload_lock.release()
+
+def invalidate_catalog():
+    """Force a version check on the next get_catalog() call."""
+    global _checked_at
+    _checked_at = 0.0
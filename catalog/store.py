@@ -0,0 +1,98 @@
+# catalog/store.py — compiled, memory-mapped on-disk catalog cache
+#
+# Layout of one build (all arrays are plain .npy so they can be mmapped):
+#   <STORE_DIR>/CURRENT              name of the active build directory
+#   <STORE_DIR>/<build>/manifest.json   source version, CompactCatalog meta, array list
+#   <build>/<name>.npy               one CompactCatalog array (ids, rating, text buffer, facet CSR parts...)
+# Every worker process maps the same files read-only, so the catalog lives once
+# in the page cache per host instead of once per process.
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Optional
+import numpy as np
+
+import data
+from .compact import CompactCatalog
+
+FORMAT_VERSION = 4
+STORE_DIR = os.getenv("CATALOG_CACHE_DIR", os.path.join(data.BASE_DIR, ".cache", "catalog"))
+
+def _build_name(version: str) -> str:
+    return hashlib.sha1(f"{FORMAT_VERSION}:{version}".encode("utf-8")).hexdigest()[:16]
+
+def _write_build(compact: CompactCatalog, version: str, path: str):
+    files = {}
+    for name, arr in compact.arrays().items():
+        arr = np.ascontiguousarray(arr)
+        np.save(os.path.join(path, f"{name}.npy"), arr)
+        files[name] = {"dtype": str(arr.dtype), "shape": list(arr.shape)}
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "source_version": version,
+        "meta": compact.meta(),
+        "files": files,
+        "built_at": time.time(),
+    }
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+def write_store(compact: CompactCatalog, version: str, root: str = STORE_DIR) -> Optional[str]:
+    """Write a compact catalog as a new build and atomically point CURRENT at it."""
+    name = _build_name(version)
+    final = os.path.join(root, name)
+    tmp = os.path.join(root, f".{name}.{os.getpid()}.tmp")
+    try:
+        os.makedirs(root, exist_ok=True)
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        _write_build(compact, version, tmp)
+        if os.path.exists(final):
+            shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            os.replace(tmp, final)
+        pointer = os.path.join(root, f".CURRENT.{os.getpid()}.tmp")
+        with open(pointer, "w", encoding="utf-8") as f:
+            f.write(name)
+        os.replace(pointer, os.path.join(root, "CURRENT"))
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        return None
+    _prune(root, keep=name)
+    return final
+
+def _prune(root: str, keep: str):
+    # Old builds may still be mapped by other processes; on POSIX that is safe.
+    for entry in os.listdir(root):
+        p = os.path.join(root, entry)
+        if entry != keep and os.path.isdir(p) and not entry.startswith("."):
+            shutil.rmtree(p, ignore_errors=True)
+
+def current_build(root: str = STORE_DIR) -> Optional[tuple[str, dict]]:
+    try:
+        with open(os.path.join(root, "CURRENT"), encoding="utf-8") as f:
+            path = os.path.join(root, f.read().strip())
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return path, manifest
+
+def read_store(version: str, root: str = STORE_DIR) -> Optional[CompactCatalog]:
+    """Map the current build read-only if it was compiled from `version`."""
+    found = current_build(root)
+    if found is None:
+        return None
+    path, manifest = found
+    if manifest.get("source_version") != version:
+        return None
+    try:
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in manifest["files"]}
+        return CompactCatalog.from_arrays(arrays, manifest["meta"])
+    except (OSError, ValueError, KeyError):
+        return None
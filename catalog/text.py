@@ -0,0 +1,33 @@
+# catalog/text.py — ingest-time text preprocessing (runs once per catalog version)
+from __future__ import annotations
+import pandas as pd
+
+TAG_PATTERN = r"<[^>]+>"
+SNIPPET_LEN = 120
+NO_DESCRIPTION = "No description yet."
+
+GAME_COLUMNS = ("id", "title", "genres", "platforms", "cover_image", "description", "rating", "released", "game_link")
+
+def strip_html(s: pd.Series) -> pd.Series:
+    return (
+        s.fillna("").astype(str)
+         .str.replace(TAG_PATTERN, "", regex=True)
+         .str.replace("&nbsp;", " ", regex=False)
+         .str.strip()
+    )
+
+def card_snippet(description_clean: pd.Series, limit: int = SNIPPET_LEN) -> pd.Series:
+    desc = description_clean.mask(description_clean == "", NO_DESCRIPTION)
+    return desc.where(desc.str.len() <= limit, desc.str[:limit] + "...")
+
+def prepare_games(games: pd.DataFrame) -> pd.DataFrame:
+    """Add description_clean, description_snippet and combined_text in place."""
+    for c in GAME_COLUMNS:
+        if c not in games.columns:
+            games[c] = ""
+    games["description_clean"] = strip_html(games["description"])
+    for c in ("title", "genres", "platforms", "cover_image", "game_link"):
+        games[c] = games[c].fillna("").astype(str)
+    games["description_snippet"] = card_snippet(games["description_clean"])
+    games["combined_text"] = (games["genres"] + " " + games["description_clean"]).str.strip()
+    return games
@@ -1,20 +1,19 @@
-# data.py — simplified: only load game metadata (no ratings)
+# data.py — load game metadata and user ratings
+import logging
 import os
 from typing import Optional
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
+import db
+from utils.ingest_utils import GAME_METADATA, coerce, summarize
+
 load_dotenv()
 
-DB_CFG = {
-    "host": os.getenv("MYSQL_ADDON_HOST"),
-    "port": int(os.getenv("MYSQL_ADDON_PORT", 3306)),
-    "user": os.getenv("MYSQL_ADDON_USER"),
-    "password": os.getenv("MYSQL_ADDON_PASSWORD"),
-    "database": os.getenv("MYSQL_ADDON_DB"),
-}
+log = logging.getLogger(__name__)
 
-USE_DB = all(DB_CFG.values())
+USE_DB = db.configured()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -32,6 +31,13 @@ def _first_existing(paths):
 
 GAMES_PATH = _first_existing(CANDIDATE_GAMES)
 
+CANDIDATE_RATINGS = [
+    os.path.join(BASE_DIR, "game_ratings.csv"),
+    os.path.join(DATA_DIR, "game_ratings.csv"),
+]
+
+RATINGS_PATH = _first_existing(CANDIDATE_RATINGS)
+
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df.columns = [c.strip().lower() for c in df.columns]
@@ -43,16 +49,6 @@ def _ensure_cols(df: pd.DataFrame, cols, fill="") -> pd.DataFrame:
             df[c] = fill
     return df
 
-def _connect_mysql():
-    import mysql.connector
-    return mysql.connector.connect(
-        host=DB_CFG["host"],
-        port=DB_CFG["port"],
-        user=DB_CFG["user"],
-        password=DB_CFG["password"],
-        database=DB_CFG["database"],
-    )
-
 def _load_games_from_db(limit: Optional[int] = None) -> pd.DataFrame:
     base_sql = """
         SELECT 
@@ -71,18 +67,10 @@ def _load_games_from_db(limit: Optional[int] = None) -> pd.DataFrame:
         base_sql += f" LIMIT {int(limit)}"
 
     try:
-        conn = _connect_mysql()
-        df = pd.read_sql(base_sql, conn)
-        conn.close()
+        df = db.read_frame(base_sql)
     except Exception:
         return _load_games_from_csv(limit)
-
-    df = _normalize_columns(df)
-    df = _ensure_cols(df, ["id","title","genres","platforms","description","rating","released","cover_image","game_link"])
-    df["id"] = df["id"].astype(str)
-    for c in ["title","genres","platforms","description","cover_image","game_link"]:
-        df[c] = df[c].astype(str).fillna("")
-    return df
+    return _games_frame(df, "game_metadata")
 
 def _load_games_from_csv(nrows: Optional[int] = None) -> pd.DataFrame:
     if not GAMES_PATH:
@@ -92,29 +80,96 @@ def _load_games_from_csv(nrows: Optional[int] = None) -> pd.DataFrame:
     except Exception:
         return pd.DataFrame()
 
-    df = _normalize_columns(df)
-
-    if "id" not in df.columns:
-        for c in ("game_id", "itemid", "item_id"):
-            if c in df.columns:
-                df = df.rename(columns={c: "id"})
-                break
-    if "title" not in df.columns:
-        for c in ("name", "game", "item_name", "title_name"):
-            if c in df.columns:
-                df = df.rename(columns={c: "title"})
-                break
-    if "description" not in df.columns:
-        for c in ("desc", "summary", "about", "details"):
-            if c in df.columns:
-                df = df.rename(columns={c: "description"})
-                break
-
-    df = _ensure_cols(df, ["id","title","genres","platforms","description","rating","released","cover_image","game_link"])
-    df["id"] = df["id"].astype(str)
-    for c in ["title","genres","platforms","description","cover_image","game_link"]:
-        df[c] = df[c].astype(str).fillna("")
-    return df
+    return _games_frame(df, GAMES_PATH)
+
+_APP_COLUMNS = {"game_id": "id", "name": "title"}
+
+def _games_frame(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """App-facing catalog frame: string ids, "" for missing text (never "nan" / "None").
+
+    Rows without a numeric game id are dropped; the count is logged so the loss is visible.
+    """
+    try:
+        result = coerce(df, GAME_METADATA)
+    except ValueError as e:  # no id column at all
+        log.warning("%s: %s", source, e)
+        return pd.DataFrame()
+    if len(result.rejected):
+        log.warning("%s: %s", source, summarize(result))
+    columns = {}
+    for name, values in result.frame.items():
+        values = values.to_numpy()
+        if name == "game_id":
+            values = values.astype(str).astype(object)
+        elif values.dtype == object:
+            values = np.where(pd.isna(values), "", values)
+        columns[_APP_COLUMNS.get(name, name)] = values
+    return pd.DataFrame(columns, copy=False)
+
+def _clean_ratings(df: pd.DataFrame) -> pd.DataFrame:
+    df = _ensure_cols(_normalize_columns(df), ["game_id", "user_id", "rating"], fill=None)
+    gid = pd.to_numeric(df["game_id"], errors="coerce")
+    rating = pd.to_numeric(df["rating"], errors="coerce")
+    user = df["user_id"].astype("string").str.strip()
+    keep = (gid.notna() & rating.notna() & user.notna() & (user != "")).to_numpy()
+    return pd.DataFrame({
+        "game_id": gid[keep].astype(np.int64).to_numpy(),
+        "user_id": user[keep].astype("category").to_numpy(),
+        "rating": rating[keep].astype(np.float32).to_numpy(),
+    })
+
+def load_ratings(nrows: Optional[int] = None) -> pd.DataFrame:
+    """(game_id, user_id, rating) rows with a rating; user_id is categorical to keep it compact."""
+    if USE_DB:
+        sql = "SELECT game_id, user_id, rating FROM game_ratings WHERE rating IS NOT NULL"
+        if nrows and nrows > 0:
+            sql += f" LIMIT {int(nrows)}"
+        try:
+            return _clean_ratings(db.read_frame(sql))
+        except Exception:
+            pass
+    if not RATINGS_PATH:
+        return pd.DataFrame(columns=["game_id", "user_id", "rating"])
+    df = pd.read_csv(RATINGS_PATH, nrows=nrows, low_memory=False, encoding_errors="ignore",
+                     dtype={"user_id": str, "User_ID": str})
+    return _clean_ratings(df)
+
+def _csv_version() -> str:
+    if not GAMES_PATH or not os.path.exists(GAMES_PATH):
+        return "csv:none"
+    st = os.stat(GAMES_PATH)
+    return f"csv:{st.st_mtime_ns}:{st.st_size}"
+
+# import_metadata.py bumps this marker on every catalog change: a primary-key read
+_MARKER_SQL = "SELECT version FROM catalog_version WHERE id = 1"
+# fallback for tables loaded some other way (CHECKSUM TABLE scans InnoDB tables)
+_VERSION_SQL = {
+    "mysql": "CHECKSUM TABLE game_metadata",
+    "sqlite": "SELECT 'game_metadata', COUNT(*) || ':' || TOTAL(rowid) FROM game_metadata",
+}
+
+def _db_version() -> Optional[str]:
+    try:
+        row = db.query(_MARKER_SQL, one=True)
+        if row and row[0]:
+            return f"db:v{row[0]}"
+    except Exception:
+        pass
+    try:
+        row = db.query(_VERSION_SQL[db.dialect()], one=True)
+    except Exception:
+        return None
+    if not row or row[1] is None:
+        return None
+    return f"db:{row[1]}"
+
+def source_version() -> str:
+    """Cheap marker that changes whenever the game catalog source changes."""
+    if USE_DB:
+        v = _db_version()
+        if v:
+            return v
+    return _csv_version()
 
 def load_games(nrows: Optional[int] = None) -> pd.DataFrame:
     if USE_DB:
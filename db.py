@@ -0,0 +1,309 @@
+# db.py — shared, pooled database access (MySQL in production, SQLite for local runs)
+#
+#   from db import query, execute, Error
+#   row = query("SELECT email FROM users WHERE username=%s", (name,), one=True, dictionary=True)
+#   execute("UPDATE users SET email=%s WHERE username=%s", (email, name))
+#
+# Backend: DB_BACKEND=mysql|sqlite. When unset, MySQL is used if MYSQL_ADDON_* is
+# complete, otherwise a local SQLite file (DB_SQLITE_PATH). Queries use the
+# MySQL "%s" placeholder style on both backends.
+from __future__ import annotations
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_CFG = {
+    "host": os.getenv("MYSQL_ADDON_HOST"),
+    "port": int(os.getenv("MYSQL_ADDON_PORT", "3306")),
+    "user": os.getenv("MYSQL_ADDON_USER"),
+    "password": os.getenv("MYSQL_ADDON_PASSWORD"),
+    "database": os.getenv("MYSQL_ADDON_DB"),
+}
+MYSQL_CONFIGURED = all(DB_CFG.values())
+BACKEND = (os.getenv("DB_BACKEND") or ("mysql" if MYSQL_CONFIGURED else "sqlite")).lower()
+SQLITE_PATH = os.getenv("DB_SQLITE_PATH", os.path.join(".cache", "app.db"))
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))        # wait for a free connection
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", "15"))      # per statement, seconds
+PING_AFTER = float(os.getenv("DB_PING_AFTER", "30"))            # health-check connections idle this long
+LOCAL_INFILE = os.getenv("DB_LOCAL_INFILE") == "1"              # allow LOAD DATA LOCAL INFILE (bulk imports)
+MAX_RETRIES = 1
+
+class PoolTimeout(Exception):
+    """No pooled connection became free within DB_POOL_TIMEOUT."""
+
+try:
+    import mysql.connector
+    from mysql.connector import errorcode as _errorcode
+    Error: tuple = (mysql.connector.Error, sqlite3.Error, PoolTimeout)
+    # server gone away / lost / unreachable / lost during query / idle-disconnected
+    _STALE_ERRNOS = {_errorcode.CR_SERVER_GONE_ERROR, _errorcode.CR_SERVER_LOST,
+                     _errorcode.CR_CONN_HOST_ERROR, 2055, 4031}
+except ImportError:  # SQLite-only installs
+    mysql = None
+    Error = (sqlite3.Error, PoolTimeout)
+    _STALE_ERRNOS = set()
+
+_PARAM_RE = re.compile(r"%s")
+
+def configured() -> bool:
+    """True when queries go to a deliberately configured database (not the implicit local file)."""
+    return BACKEND == "mysql" and MYSQL_CONFIGURED or BACKEND == "sqlite" and bool(os.getenv("DB_BACKEND"))
+
+def dialect() -> str:
+    return BACKEND
+
+class _Conn:
+    """A pooled driver connection plus the bookkeeping the pool needs."""
+
+    def __init__(self, raw, backend: str):
+        self.raw = raw
+        self.backend = backend
+        self.last_used = time.monotonic()
+        self.timeout_ms: Optional[int] = None
+
+    def healthy(self) -> bool:
+        if self.backend == "sqlite" or time.monotonic() - self.last_used < PING_AFTER:
+            return True
+        try:
+            self.raw.ping(reconnect=False, attempts=1, delay=0)
+            return True
+        except Error:
+            return False
+
+    def close(self):
+        try:
+            self.raw.close()
+        except Error:
+            pass
+
+    def cursor(self, dictionary: bool = False):
+        if self.backend == "mysql":
+            return self.raw.cursor(dictionary=dictionary)
+        cur = self.raw.cursor()
+        if dictionary:
+            cur.row_factory = lambda c, row: {d[0]: v for d, v in zip(c.description, row)}
+        return cur
+
+    def sql(self, statement: str) -> str:
+        return statement if self.backend == "mysql" else _PARAM_RE.sub("?", statement)
+
+    def set_timeout(self, seconds: Optional[float]):
+        ms = int(seconds * 1000) if seconds else 0
+        if self.backend == "mysql":
+            if ms != self.timeout_ms:
+                cur = self.raw.cursor()
+                cur.execute("SET SESSION MAX_EXECUTION_TIME=%s", (ms,))
+                cur.close()
+                if hasattr(self.raw, "read_timeout"):
+                    # the socket timeout would otherwise cut off untimed work (DDL, bulk loads)
+                    self.raw.read_timeout = int(seconds) + 5 if ms else None
+                self.timeout_ms = ms
+            return
+        if not ms:
+            self.raw.set_progress_handler(None, 0)
+            return
+        deadline = time.monotonic() + ms / 1000.0
+        # a non-zero return aborts the running statement with OperationalError("interrupted")
+        self.raw.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+
+def _connect(backend: str) -> _Conn:
+    if backend == "mysql":
+        if mysql is None:
+            raise RuntimeError("mysql-connector-python is not installed")
+        missing = [k for k, v in DB_CFG.items() if not v]
+        if missing:
+            raise RuntimeError(f"Missing DB config: {missing}. Set Clever Cloud environment variables.")
+        raw = mysql.connector.connect(**DB_CFG, connection_timeout=CONNECT_TIMEOUT,
+                                      read_timeout=int(QUERY_TIMEOUT) + 5, allow_local_infile=LOCAL_INFILE)
+        return _Conn(raw, backend)
+    folder = os.path.dirname(SQLITE_PATH)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    raw = sqlite3.connect(SQLITE_PATH, timeout=CONNECT_TIMEOUT, check_same_thread=False)
+    raw.execute("PRAGMA journal_mode=WAL")
+    raw.execute("PRAGMA foreign_keys=ON")
+    return _Conn(raw, backend)
+
+class ConnectionPool:
+    """Bounded, thread-safe pool: at most `size` open connections per process.
+
+    Checkout blocks up to `timeout` seconds for a free connection; idle
+    connections are health-checked before reuse and replaced when dead.
+    """
+
+    def __init__(self, backend: str, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.backend = backend
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_Conn]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.in_use = 0
+
+    def acquire(self) -> _Conn:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"no free {self.backend} connection after {self.timeout:g}s (pool size {self.size})")
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = _connect(self.backend)
+                    with self._lock:
+                        self.opened += 1
+                    break
+                if not conn.healthy():
+                    self.discard(conn, release=False)
+                    conn = None
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return conn
+
+    def release(self, conn: _Conn):
+        conn.last_used = time.monotonic()
+        self._idle.put(conn)
+        with self._lock:
+            self.in_use -= 1
+        self._slots.release()
+
+    def discard(self, conn: _Conn, release: bool = True):
+        conn.close()
+        with self._lock:
+            self.opened -= 1
+            if release:
+                self.in_use -= 1
+        if release:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self.opened -= 1
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "size": self.size, "open": self.opened, "in_use": self.in_use,
+                "idle": self._idle.qsize()}
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(BACKEND)
+    return _pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+
+def _is_stale(e: Exception) -> bool:
+    return mysql is not None and isinstance(e, mysql.connector.Error) and e.errno in _STALE_ERRNOS
+
+@contextmanager
+def connection(timeout: Optional[float] = QUERY_TIMEOUT):
+    """Pooled connection for multi-statement work; commits on success, rolls back on error."""
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        conn.set_timeout(timeout)
+        yield conn
+        conn.raw.commit()
+    except BaseException as e:
+        if _is_stale(e):
+            pool.discard(conn)
+            raise
+        try:
+            conn.raw.rollback()
+        except Error:
+            pool.discard(conn)
+            raise e
+        pool.release(conn)
+        raise
+    else:
+        pool.release(conn)
+
+def _run(fn, timeout: Optional[float], retry: bool = False):
+    # Only reads are retried on a fresh connection. A write whose connection
+    # drops during COMMIT may already be applied on the server, so replaying
+    # it could apply it twice; those errors go to the caller.
+    for attempt in range(MAX_RETRIES + 1 if retry else 1):
+        try:
+            with connection(timeout) as conn:
+                return fn(conn)
+        except Error as e:
+            if not retry or attempt >= MAX_RETRIES or not _is_stale(e):
+                raise
+
+def query(sql: str, params: Iterable[Any] = (), one: bool = False, dictionary: bool = False,
+          timeout: Optional[float] = QUERY_TIMEOUT):
+    """Run a SELECT; returns all rows, or the first row (None if empty) with one=True."""
+    def fn(conn: _Conn):
+        cur = conn.cursor(dictionary=dictionary)
+        try:
+            cur.execute(conn.sql(sql), tuple(params))
+            return cur.fetchone() if one else cur.fetchall()
+        finally:
+            cur.close()
+    return _run(fn, timeout, retry=True)
+
+def execute(sql: str, params: Iterable[Any] = (), many: bool = False,
+            timeout: Optional[float] = QUERY_TIMEOUT) -> int:
+    """Run a write (or executemany with many=True) in its own transaction; returns rowcount.
+
+    Never retried: a connection lost during commit leaves the outcome unknown.
+    """
+    def fn(conn: _Conn):
+        cur = conn.cursor()
+        try:
+            if many:
+                cur.executemany(conn.sql(sql), [tuple(p) for p in params])
+            else:
+                cur.execute(conn.sql(sql), tuple(params))
+            return cur.rowcount
+        finally:
+            cur.close()
+    return _run(fn, timeout)
+
+def read_frame(sql: str, params: Iterable[Any] = (), timeout: Optional[float] = QUERY_TIMEOUT):
+    """Run a SELECT into a DataFrame."""
+    import pandas as pd
+
+    def fn(conn: _Conn):
+        cur = conn.cursor()
+        try:
+            cur.execute(conn.sql(sql), tuple(params))
+            cols = [d[0] for d in cur.description]
+            return pd.DataFrame.from_records(cur.fetchall(), columns=cols)
+        finally:
+            cur.close()
+    return _run(fn, timeout, retry=True)
+
+def stats() -> dict:
+    return get_pool().stats()
@@ -0,0 +1,152 @@
+# evaluate.py — offline quality and latency evaluation of the recommenders
+#   python evaluate.py --synthetic 100000 [--modes popular,cb,cf,hybrid] [--users 500] [--json out.json]
+#   python evaluate.py [--cb-model models/cb_index]          # real catalog + game_ratings
+import argparse
+import json
+import resource
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from catalog.keys import KeyIndex
+from catalog.text import prepare_games
+from utils.cf_utils import ALSModel, DEFAULT_FACTORS, DEFAULT_REG, DEFAULT_ITERS
+from utils.eval_utils import split_ratings, ranking_metrics, coverage, latency_summary, timed_calls, peak_memory_mb
+from utils.recommender_utils import (
+    build_cb_index, build_neighbor_table, catalog_fingerprint, load_cb_model,
+    get_cb_recommendations, get_cf_recommendations, get_hybrid_recommendations,
+)
+
+MODES = ("popular", "cb", "cf", "hybrid")
+MEMORY_SAMPLE = 50
+
+def _load_data(args):
+    if args.synthetic:
+        from utils.synthetic_utils import synthetic_catalog, synthetic_ratings
+        games = synthetic_catalog(args.synthetic, seed=args.seed)
+        n_users = args.synthetic_users or max(100, args.synthetic // 2)
+        ratings = synthetic_ratings(games, n_users, seed=args.seed)
+        if args.write_csv:
+            import os
+            os.makedirs(args.write_csv, exist_ok=True)
+            games.drop(columns="topic").rename(columns={"id": "game_id", "title": "name"}).to_csv(
+                os.path.join(args.write_csv, "game_metadata.csv"), index=False)
+            ratings.to_csv(os.path.join(args.write_csv, "game_ratings.csv"), index=False)
+        return prepare_games(games.drop(columns="topic")), ratings
+    from catalog import get_catalog
+    from data import load_ratings
+    games = get_catalog().columns()
+    return games.astype({"id": str}), load_ratings()
+
+def _cb_model(args, games):
+    if args.cb_model:
+        from utils.artifact_utils import manifest_stamp
+        return load_cb_model(args.cb_model, catalog_fingerprint(games), manifest_stamp(args.cb_model))
+    model = build_cb_index(games)
+    if args.neighbors > 0:
+        model["neighbors"] = build_neighbor_table(model, args.neighbors)
+    return model
+
+def _popular(train: pd.DataFrame, games: pd.DataFrame, k: int):
+    order = train["game_id"].astype(str).value_counts().index
+    order = order[order.isin(games["id"])].to_numpy(dtype=object)
+    rated = train["game_id"].astype(str).to_numpy(dtype=object)
+    by_user = train.groupby("user_id", observed=True).indices
+
+    def recommend(user):
+        mine = set(rated[by_user[user]]) if user in by_user else set()
+        head = order[:k + len(mine)]
+        return head[[g not in mine for g in head]][:k]
+    return recommend
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Evaluate recommender quality, latency and memory offline.")
+    ap.add_argument("--synthetic", type=int, default=0, help="generate a synthetic catalog of N games")
+    ap.add_argument("--synthetic-users", type=int, default=0, help="synthetic users (default N/2)")
+    ap.add_argument("--write-csv", default=None, help="also write the synthetic data as CSVs into this directory")
+    ap.add_argument("--modes", default=",".join(MODES), help=f"comma-separated subset of {','.join(MODES)}")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--users", type=int, default=500, help="evaluated users (sampled)")
+    ap.add_argument("--test-frac", type=float, default=0.2)
+    ap.add_argument("--relevant-min", type=float, default=4.0, help="held-out ratings >= this count as relevant")
+    ap.add_argument("--cb-model", default=None, help="evaluate a built CB artifact instead of fitting one")
+    ap.add_argument("--neighbors", type=int, default=0, help="build a top-K neighbour table for CB (O(N^2) work)")
+    ap.add_argument("--factors", type=int, default=DEFAULT_FACTORS)
+    ap.add_argument("--reg", type=float, default=DEFAULT_REG)
+    ap.add_argument("--iters", type=int, default=DEFAULT_ITERS)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", default=None, help="write the report as JSON")
+    args = ap.parse_args(argv)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        ap.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    t0 = time.perf_counter()
+    games, ratings = _load_data(args)
+    if games.empty or ratings.empty:
+        print("Need both a catalog and ratings to evaluate.")
+        return 1
+    train, test = split_ratings(ratings, args.test_frac, seed=args.seed)
+    print(f"{len(games):,} games, {len(train):,} train / {len(test):,} test ratings "
+          f"(loaded in {time.perf_counter() - t0:.1f}s)")
+
+    relevant = test[test["rating"] >= args.relevant_min]
+    relevant_ids = relevant["game_id"].astype(str).to_numpy(dtype=object)
+    relevant = {u: relevant_ids[idx] for u, idx in relevant.groupby("user_id", observed=True).indices.items()}
+    top_seed = train.sort_values("rating", ascending=False, kind="stable").drop_duplicates("user_id")
+    seeds = top_seed.set_index("user_id")["game_id"].astype(str)
+    users = seeds.index.intersection(pd.Index(list(relevant))).to_numpy()
+    users = np.random.default_rng(args.seed).permutation(users)[:args.users]
+    keys = KeyIndex.build(games)
+    seed_rows = keys.rows_of(seeds.loc[users].to_numpy())
+    # seed labels, not bare titles: a duplicated title would resolve to another game
+    seed_titles = np.where(seed_rows >= 0, keys.labels[seed_rows], None)
+    print(f"Evaluating {len(users):,} users at k={args.k}")
+
+    report = {"n_games": len(games), "n_train": len(train), "n_test": len(test), "n_users": len(users),
+              "k": args.k, "build": {}, "modes": {}}
+    cb_model = cf_model = None
+    if {"cb", "hybrid"} & set(modes):
+        t0 = time.perf_counter()
+        cb_model = _cb_model(args, games)
+        report["build"]["cb_s"] = time.perf_counter() - t0
+    if {"cf", "hybrid"} & set(modes):
+        t0 = time.perf_counter()
+        cf_model = ALSModel.build(train, factors=args.factors, reg=args.reg, iters=args.iters, seed=args.seed)
+        report["build"]["cf_s"] = time.perf_counter() - t0
+    for name, secs in report["build"].items():
+        print(f"  built {name[:-2]} in {secs:.1f}s")
+
+    ids = lambda df: df["id"].to_numpy(dtype=object) if not df.empty else np.empty(0, dtype=object)
+    runners = {
+        "popular": (lambda: _popular(train, games, args.k), list(users)),
+        "cb": (lambda: lambda t: ids(get_cb_recommendations(cb_model, games, t, args.k, "combined_text", keys)), list(seed_titles)),
+        "cf": (lambda: lambda u: ids(get_cf_recommendations(cf_model, games, u, args.k, keys)), list(users)),
+        "hybrid": (lambda: lambda t: ids(get_hybrid_recommendations(cb_model, cf_model, games, t, args.k, keys=keys)), list(seed_titles)),
+    }
+    want = [relevant[u] for u in users]
+    for mode in modes:
+        make, inputs = runners[mode]
+        fn = make()
+        fn(inputs[0])  # warm caches outside the timed loop
+        recs, seconds = timed_calls(fn, inputs)
+        row = {**ranking_metrics(recs, want, args.k), "coverage": coverage(recs, len(games)),
+               **latency_summary(seconds), "peak_mb": peak_memory_mb(fn, inputs[:MEMORY_SAMPLE])}
+        report["modes"][mode] = row
+        print(f"  {mode:8s} P@{args.k} {row[f'precision@{args.k}']:.4f}  R@{args.k} {row[f'recall@{args.k}']:.4f}  "
+              f"NDCG {row[f'ndcg@{args.k}']:.4f}  cov {row['coverage']:.3f}  "
+              f"p50 {row['p50_ms']:.2f}ms p95 {row['p95_ms']:.2f}ms p99 {row['p99_ms']:.2f}ms  "
+              f"{row['throughput_qps']:.0f} q/s  peak {row['peak_mb']:.1f}MB")
+
+    scale = 1 if sys.platform == "darwin" else 1024
+    report["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024)
+    print(f"Process peak RSS {report['max_rss_mb']:.0f}MB")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
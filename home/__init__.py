@@ -1,7 +1,7 @@
-import re
-import pandas as pd
 import streamlit as st
-from data import get_dataset
+from catalog import get_catalog
+from catalog.index import FacetIndex
+from catalog.search import SearchIndex
 
 from .styles import inject_styles
 from .state import (
@@ -10,36 +10,55 @@ from .state import (
     get_view, set_view, sync_view_from_query
 )
 from .filters import render_filter_bar
-from .cards import filter_games, render_game_cards
+from .cards import filter_rows, render_game_cards
 from .detail import render_detail_page
 from .account import render_account_tab
+from .recs import DEFAULT_TOPN, render_cache_stats, seed_recommendations, start_warm_up
 
+from utils.artifact_utils import ArtifactError, manifest_stamp
 from utils.recommender_utils import (
     load_cb_model,
-    get_cb_recommendations,
+    build_cb_index,
+    catalog_fingerprint,
+    load_cf_model,
+    get_cf_recommendations,
 )
 
-CB_MODEL_PATH = "best_cb_model_CB_Genres_Description.pkl"
-
-_TAG_RE = re.compile(r"<[^>]+>")
-
-def _strip_html(s: str) -> str:
-    if not isinstance(s, str):
-        return ""
-    return _TAG_RE.sub("", s).replace("&nbsp;", " ").strip()
-
-def _prepare_games_columns(games: pd.DataFrame) -> pd.DataFrame:
-    need = ("id", "title", "genres", "platforms", "cover_image", "description", "rating", "released", "game_link")
-    for c in need:
-        if c not in games.columns:
-            games[c] = ""
-    games["description_clean"] = games["description"].apply(_strip_html)
-    for c in ("title", "genres", "platforms", "cover_image", "game_link"):
-        games[c] = games[c].fillna("").astype(str)
-    games["combined_text"] = (
-        games["genres"].fillna("") + " " + games["description_clean"].fillna("")
-    ).str.strip()
-    return games
+CB_INDEX_PATH = "models/cb_index"
+CB_COLUMNS = ("id", "title", "combined_text")
+
+def _load_prebuilt_cb(catalog):
+    """Offline-built CB artifact for this catalog; raises if missing or stale."""
+    fingerprint = catalog.derived("cb_fingerprint", catalog_fingerprint, columns=CB_COLUMNS)
+    return load_cb_model(CB_INDEX_PATH, fingerprint, manifest_stamp(CB_INDEX_PATH))
+
+def _resolve_cb_model(catalog):
+    """Prebuilt artifact if it matches this catalog, else one fitted once per catalog version."""
+    try:
+        return _load_prebuilt_cb(catalog), None
+    except (OSError, ArtifactError) as e:
+        return catalog.derived("cb_index", build_cb_index, columns=CB_COLUMNS), str(e)
+
+def _neighbor_table(catalog):
+    """Precomputed neighbour table for this catalog, or None (never built online)."""
+    try:
+        return _load_prebuilt_cb(catalog).get("neighbors")
+    except (OSError, ArtifactError):
+        return None
+
+def _seed_labels(catalog):
+    """Selectbox options, one per game (duplicate titles carry their id)."""
+    return catalog.derived("seed_titles", lambda _: catalog.keys.seed_labels())
+
+CF_MODEL_PATH = "models/cf_als"
+CF_TOPN = 6
+
+def _cf_model():
+    """Offline-trained CF model, or None when build_cf_model.py has not been run."""
+    try:
+        return load_cf_model(CF_MODEL_PATH, manifest_stamp(CF_MODEL_PATH))
+    except (OSError, ArtifactError):
+        return None
 
 def show_home():
     st.markdown('<div id="top-anchor"></div>', unsafe_allow_html=True)
@@ -63,19 +82,19 @@ def show_home():
     st.markdown(f"### Welcome, **{username}**! 👋")
     st.markdown("---")
 
-    games = get_dataset()
-    if games.empty:
+    catalog = get_catalog()
+    if catalog.empty:
         st.warning("⚠️ No game data found.")
         scroll_to_top_after_render()
         return
-    games = _prepare_games_columns(games)
+    games = catalog.games
 
     view = get_view()
     if view == "detail":
         gid = st.session_state.get("detail_game_id") or st.query_params.get("gid")
         if isinstance(gid, list):
             gid = gid[0]
-        render_detail_page(games, str(gid) if gid else "")
+        render_detail_page(catalog, str(gid) if gid else "", neighbors=_neighbor_table(catalog))
         scroll_to_top_after_render()
         return
 
@@ -84,17 +103,21 @@ def show_home():
     with tab1:
         st.subheader("Game list 🎮")
 
-        sel_genres, sel_plats, search_kw = render_filter_bar(games)
-        reset_page_if_filter_changed((tuple(sel_genres), tuple(sel_plats), search_kw))
+        facets = catalog.derived("facets", lambda _: FacetIndex.from_compact(catalog.compact))
+        search = catalog.derived("search", SearchIndex.build, columns=("title", "description_clean")) if (st.session_state.get("f_kw") or "").strip() else None
 
-        df = filter_games(games, sel_genres, sel_plats, search_kw)
+        sel_genres, sel_plats, search_kw, sort_mode = render_filter_bar(facets, search)
+        reset_page_if_filter_changed((tuple(sel_genres), tuple(sel_plats), search_kw, sort_mode))
 
-        total_items = len(df)
+        rows = filter_rows(games, facets, sel_genres, sel_plats, search_kw,
+                           search=search, by_relevance=(sort_mode == "Relevance"))
+
+        total_items = len(rows)
         total_pages = max(1, (total_items + PAGE_SIZE - 1) // PAGE_SIZE)
         page = get_current_page(total_pages)
         start = (page - 1) * PAGE_SIZE
         end = start + PAGE_SIZE
-        page_df = df.iloc[start:end]
+        page_df = catalog.rows(rows[start:end])
 
         render_game_cards(page_df, start)
 
@@ -119,37 +142,42 @@ def show_home():
                     st.rerun()
 
     with tab2:
+        cf_model = _cf_model()
+        username = st.session_state.get("username", "")
+        if cf_model is not None and username:
+            cf_df = get_cf_recommendations(cf_model, games, username, topn=CF_TOPN, keys=catalog.keys)
+            if not cf_df.empty:
+                st.subheader("⭐ Recommended for you")
+                render_game_cards(catalog.hydrate(cf_df), start_index=0, key_prefix="cf_")
+                st.markdown("---")
+
         st.subheader("🎯 Choose your favorite game")
-        topn = st.slider("Number of recommendations", min_value=3, max_value=30, value=5, step=1)
+        topn = st.slider("Number of recommendations", min_value=3, max_value=30, value=DEFAULT_TOPN, step=1)
 
-        cb_model = None
-        cb_load_err = None
-        try:
-            cb_model = load_cb_model(CB_MODEL_PATH)
-        except Exception as e:
-            cb_load_err = str(e)
-            st.warning("Unable to load CB model. Using fallback TF-IDF on 'genres'.")
+        cb_model, cb_load_err = _resolve_cb_model(catalog)
 
         seed = st.selectbox(
             "Choose a game you like to get recommendations:",
-            options=sorted(games["title"].dropna().unique().tolist())
+            options=_seed_labels(catalog)
+        )
+        hybrid = cf_model is not None and st.toggle(
+            "Blend in player ratings", value=True, key="rec_hybrid",
+            help="Mix content similarity with what players who rated this game also liked."
         )
+        start_warm_up(catalog, cb_model, cf_model)
         if seed:
-            rec_df = get_cb_recommendations(
-                cb_model, games,
-                seed_title=seed,
-                topn=topn,
-                text_col="combined_text"
-            )
+            rec_df = seed_recommendations(catalog, cb_model, cf_model, seed, topn, hybrid)
             if rec_df is None or rec_df.empty:
                 if cb_load_err:
                     st.info("Fallback TF-IDF also failed to recommend. Try another seed or check the dataset.")
                 else:
                     st.info("Not found. Try another game.")
             else:
-                render_game_cards(rec_df, start_index=0, key_prefix="rec_")
+                render_game_cards(catalog.hydrate(rec_df), start_index=0, key_prefix="rec_")
 
     with tab3:
         render_account_tab(st.session_state.get("username", ""))
+        with st.expander("📈 Diagnostics"):
+            render_cache_stats()
 
     scroll_to_top_after_render()
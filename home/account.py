@@ -1,22 +1,7 @@
-import os, re, hashlib, time
+import re, hashlib, time
 import streamlit as st
-import mysql.connector
-from mysql.connector import Error
+import db
 from utils.email_utils import gen_code, send_code
-from dotenv import load_dotenv
-
-load_dotenv()
-
-DB_CFG = {
-    "host": os.getenv("MYSQL_ADDON_HOST"),
-    "port": int(os.getenv("MYSQL_ADDON_PORT", "3306")),
-    "user": os.getenv("MYSQL_ADDON_USER"),
-    "password": os.getenv("MYSQL_ADDON_PASSWORD"),
-    "database": os.getenv("MYSQL_ADDON_DB"),
-}
-
-def _get_conn():
-    return mysql.connector.connect(**DB_CFG)
 
 EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$", re.IGNORECASE)
 
@@ -40,30 +25,15 @@ def _pw_strength_msg(pw: str) -> tuple[bool, str]:
     return True, "Strong password"
 
 def _get_user(username: str):
-    conn = _get_conn()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT username, password_hash, email FROM users WHERE username=%s", (username,))
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
-    return row
+    return db.query("SELECT username, password_hash, email FROM users WHERE username=%s", (username,),
+                    one=True, dictionary=True)
 
 def _update_password(username: str, new_pw: str):
     pw_hash = _sha256(new_pw)
-    conn = _get_conn()
-    cur = conn.cursor()
-    cur.execute("UPDATE users SET password_hash=%s WHERE username=%s", (pw_hash, username))
-    conn.commit()
-    cur.close()
-    conn.close()
+    db.execute("UPDATE users SET password_hash=%s WHERE username=%s", (pw_hash, username))
 
 def _update_email(username: str, new_email: str):
-    conn = _get_conn()
-    cur = conn.cursor()
-    cur.execute("UPDATE users SET email=%s WHERE username=%s", (new_email, username))
-    conn.commit()
-    cur.close()
-    conn.close()
+    db.execute("UPDATE users SET email=%s WHERE username=%s", (new_email, username))
 
 def _reset_pwd_flow():
     for k in ("_pwd_verify", "pwd_verify_code", "_pwd_code_verified", "acc_old_pw", "acc_new_pw", "acc_cfm_pw"):
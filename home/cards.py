@@ -1,33 +1,24 @@
-import re
+import numpy as np
 import pandas as pd
 import streamlit as st
+from catalog.index import FacetIndex, rows_of
+from catalog.search import SearchIndex
+from catalog.text import NO_DESCRIPTION
 from .state import request_scroll_to_top, set_view
 
-_TAG_RE = re.compile(r"<[^>]+>")
-
-def _strip_html(s: str) -> str:
-    if not isinstance(s, str):
-        return ""
-    return _TAG_RE.sub("", s).replace("&nbsp;", " ").strip()
-
-def _contains_any(cell: str, selected: list[str]) -> bool:
-    if not selected:
-        return True
-    if not isinstance(cell, str):
-        return False
-    s = {t.strip().lower() for t in cell.split(",")}
-    return any(x.lower() in s for x in selected)
-
-def filter_games(games: pd.DataFrame, genres: list[str], plats: list[str], kw: str) -> pd.DataFrame:
-    df = games.copy()
-    if genres:
-        df = df[df["genres"].apply(lambda s: _contains_any(s, genres))]
-    if plats:
-        df = df[df["platforms"].apply(lambda s: _contains_any(s, plats))]
+def filter_rows(games: pd.DataFrame, index: FacetIndex, genres: list[str], plats: list[str], kw: str,
+                search: SearchIndex | None = None, by_relevance: bool = True) -> np.ndarray:
+    """Row positions matching the filters; nothing is copied or materialized."""
+    rows = rows_of(index.mask(genres, plats), index.n_rows)
     kw = (kw or "").strip()
-    if kw:
-        df = df[df["title"].str.contains(kw, case=False, na=False)]
-    return df
+    if kw and len(rows) and search is not None:
+        rows = search.search(kw, rows)
+        if not by_relevance:
+            rows = np.sort(rows)
+    elif kw and len(rows):
+        titles = pd.Series(games["title"].to_numpy()[rows])
+        rows = rows[titles.str.contains(kw, case=False, regex=False, na=False).to_numpy()]
+    return rows
 
 def render_game_cards(page_df: pd.DataFrame, start_index: int, key_prefix: str = ""):
     n_cols = 3
@@ -62,9 +53,7 @@ def render_game_cards(page_df: pd.DataFrame, start_index: int, key_prefix: str =
                 if platforms_str:
                     st.markdown(f"<div class='game-meta'>{platforms_str}</div>", unsafe_allow_html=True)
 
-                desc = _strip_html(g.get("description", "")) or "No description yet."
-                desc_limit = 120
-                st.caption(desc[:desc_limit] + ("..." if len(desc) > desc_limit else ""))
+                st.caption(g.get("description_snippet") or NO_DESCRIPTION)
 
                 safe_id = str(g.get("id", "NA"))
                 button_key = f"{key_prefix}detail_{start_index}_{idx}_{row_idx}_{safe_id}"
@@ -1,24 +1,19 @@
 import streamlit as st
 import pandas as pd
-import re
 
 from .state import request_scroll_to_top, set_view
+from .cards import render_game_cards
 
-_TAG_RE = re.compile(r"<[^>]+>")
+SIMILAR_COUNT = 6
 
-def _strip_html(s: str) -> str:
-    if not isinstance(s, str):
-        return ""
-    return _TAG_RE.sub("", s).replace("&nbsp;", " ").strip()
-
-def _get_game_row(games: pd.DataFrame, gid: str) -> pd.Series | None:
-    if games is None or games.empty:
+def _get_game_row(catalog, gid: str) -> pd.Series | None:
+    if catalog is None or catalog.empty:
         return None
-    row = games[games["id"].astype(str) == str(gid)]
-    return row.iloc[0] if not row.empty else None
+    pos = catalog.keys.row_of(gid)
+    return catalog.rows([pos]).iloc[0] if pos >= 0 else None
 
-def render_detail_page(games: pd.DataFrame, gid: str):
-    game = _get_game_row(games, gid)
+def render_detail_page(catalog, gid: str, neighbors=None):
+    game = _get_game_row(catalog, gid)
     if game is None:
         st.warning("Game not found.")
         st.button("⬅️ Back", on_click=lambda: (set_view("list", None), request_scroll_to_top()))
@@ -48,8 +43,15 @@ def render_detail_page(games: pd.DataFrame, gid: str):
 
     st.markdown("---")
     st.markdown("#### Description")
-    desc = _strip_html(game.get("description","") or "")    
+    desc = game.get("description_clean", "") or ""
     st.write(desc if desc else "_No description available._")
 
+    if neighbors is not None:
+        rows, _ = neighbors.lookup(game.name, SIMILAR_COUNT)
+        if len(rows):
+            st.markdown("---")
+            st.markdown("#### Similar games")
+            render_game_cards(catalog.rows(rows), start_index=0, key_prefix="sim_")
+
     st.markdown("---")
     st.button("⬅️ Back to list", on_click=lambda: (set_view("list", None), request_scroll_to_top()))
@@ -1,26 +1,38 @@
 # home/filters.py
-import pandas as pd
 import streamlit as st
+from catalog.index import FacetIndex, mask_of
+from catalog.search import SearchIndex
 
-def _split_tokens(series: pd.Series) -> list[str]:
-    toks: set[str] = set()
-    for v in series.dropna().astype(str):
-        for p in v.split(","):
-            t = p.strip()
-            if t:
-                toks.add(t)
-    return sorted(toks)
+SORT_MODES = ["Relevance", "Catalog order"]
+FACET_CAPTION_TOP = 6
 
-def render_filter_bar(games: pd.DataFrame):
-    all_genres = _split_tokens(games["genres"])
-    all_plats  = _split_tokens(games["platforms"])
+def _facet_caption(counts: dict[str, int], selected: list[str]) -> str:
+    # Counts live outside the multiselect: Streamlit treats formatted option
+    # labels as part of the widget identity and would drop the selection.
+    top = sorted(((n, t) for t, n in counts.items() if n and t not in selected), reverse=True)[:FACET_CAPTION_TOP]
+    parts = [f"**{t} ({counts.get(t, 0):,})**" for t in selected] + [f"{t} ({n:,})" for n, t in top]
+    return " · ".join(parts)
 
-    c1, c2, c3 = st.columns([1, 1, 2])
+def render_filter_bar(facets: FacetIndex, search: SearchIndex | None = None):
+    # Widget values from the previous interaction drive the live counts.
+    cur_genres = st.session_state.get("f_genres", [])
+    cur_plats = st.session_state.get("f_plats", [])
+    cur_kw = (st.session_state.get("f_kw", "") or "").strip()
+    base = mask_of(search.search(cur_kw), facets.n_rows) if cur_kw and search is not None else None
+    genre_counts, plat_counts = facets.facet_counts(cur_genres, cur_plats, base)
+
+    c1, c2, c3, c4 = st.columns([1, 1, 2, 1])
     with c1:
-        selected_genres = st.multiselect("📂 Genres", options=all_genres, default=[], key="f_genres")
+        selected_genres = st.multiselect("📂 Genres", options=facets.genres.vocabulary(), default=[], key="f_genres")
+        st.caption(_facet_caption(genre_counts, selected_genres))
     with c2:
-        selected_plats = st.multiselect("💻 Platforms", options=all_plats, default=[], key="f_plats")
+        selected_plats = st.multiselect("💻 Platforms", options=facets.platforms.vocabulary(), default=[], key="f_plats")
+        st.caption(_facet_caption(plat_counts, selected_plats))
     with c3:
-        search_kw = st.text_input("🔎 Search by game name", value="", placeholder="enter keyword…", key="f_kw")
+        search_kw = st.text_input("🔎 Search games", value="", placeholder="title or theme, e.g. zombie co-op", key="f_kw",
+                                  help="Matches words in titles and descriptions (the last word as a prefix). "
+                                       "Titles that contain the text anywhere follow the ranked matches.")
+    with c4:
+        sort_mode = st.selectbox("↕️ Sort", options=SORT_MODES, key="f_sort", disabled=not (search_kw or "").strip())
 
-    return selected_genres, selected_plats, search_kw
+    return selected_genres, selected_plats, search_kw, sort_mode
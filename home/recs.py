@@ -0,0 +1,103 @@
+# home/recs.py — seed recommendations through a process-wide result cache, plus its startup warm-up
+import os
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.cache_utils import LRUCache
+from utils.recommender_utils import get_cb_recommendations, get_hybrid_recommendations
+
+REC_CACHE_MAX_ENTRIES = int(os.getenv("REC_CACHE_MAX_ENTRIES", "20000"))
+REC_CACHE_MAX_MB = float(os.getenv("REC_CACHE_MAX_MB", "64"))
+REC_CACHE_TTL = float(os.getenv("REC_CACHE_TTL", "3600"))      # seconds
+WARM_SEEDS = int(os.getenv("REC_WARM_SEEDS", "300"))
+DEFAULT_TOPN = 5
+TEXT_COL = "combined_text"
+SCORE_COLUMNS = ("score", "cb_score", "cf_score")
+
+@st.cache_resource(show_spinner=False)
+def rec_cache() -> LRUCache:
+    """One cache per process, shared by every session."""
+    return LRUCache(REC_CACHE_MAX_ENTRIES, int(REC_CACHE_MAX_MB * (1 << 20)), REC_CACHE_TTL)
+
+def model_version(cb_model, cf_model) -> str:
+    cb = f"{cb_model.get('catalog_fingerprint')}@{cb_model.get('built_at')}" if isinstance(cb_model, dict) else "none"
+    cf = f"{cf_model.meta.get('built_at')}" if cf_model is not None else "none"
+    return f"cb:{cb}|cf:{cf}"
+
+def _pack(rec: pd.DataFrame) -> tuple:
+    """Row positions and score arrays only; the frame is rebuilt from the shared catalog on a hit."""
+    if rec is None or rec.empty:
+        return np.empty(0, dtype=np.int32), {}
+    scores = {c: rec[c].to_numpy(dtype=np.float32) for c in SCORE_COLUMNS if c in rec.columns}
+    return rec.index.to_numpy(dtype=np.int32), scores
+
+def _unpack(catalog, packed: tuple) -> pd.DataFrame:
+    rows, scores = packed
+    if not len(rows):
+        return pd.DataFrame()
+    return catalog.games.iloc[rows].assign(**scores)
+
+def _compute(catalog, cb_model, cf_model, seed_row: int, topn: int, hybrid: bool) -> pd.DataFrame:
+    label = catalog.keys.labels[seed_row]
+    if hybrid and cf_model is not None:
+        return get_hybrid_recommendations(cb_model, cf_model, catalog.games, seed_title=label, topn=topn,
+                                          text_col=TEXT_COL, keys=catalog.keys)
+    return get_cb_recommendations(cb_model, catalog.games, seed_title=label, topn=topn,
+                                  text_col=TEXT_COL, keys=catalog.keys)
+
+def _key(catalog, versions: str, seed_id: str, topn: int, hybrid: bool) -> tuple:
+    return ("hybrid" if hybrid else "cb", seed_id, topn, TEXT_COL, catalog.version, versions)
+
+def seed_recommendations(catalog, cb_model, cf_model, seed: str, topn: int, hybrid: bool) -> pd.DataFrame:
+    """Lean (id, title, scores) frame for a seed label, served from the cache when possible."""
+    seed_row = catalog.keys.title_row(seed)
+    if seed_row is None:
+        return pd.DataFrame()
+    hybrid = hybrid and cf_model is not None
+    seed_id = str(catalog.games["id"].iat[seed_row])
+    key = _key(catalog, model_version(cb_model, cf_model), seed_id, topn, hybrid)
+    packed = rec_cache().get_or_compute(
+        key, lambda: _pack(_compute(catalog, cb_model, cf_model, seed_row, topn, hybrid)), tag=seed_id)
+    return _unpack(catalog, packed)
+
+def popular_seeds(catalog, cf_model, n: int) -> np.ndarray:
+    """Row positions to warm: this process's most requested seeds, then the most rated games."""
+    cache = rec_cache()
+    rows = list(catalog.keys.rows_of(cache.popular(n))) if cache.requests else []
+    if cf_model is not None and len(rows) < n:
+        counts = np.bincount(np.asarray(cf_model.seen.indices), minlength=len(cf_model.item_ids))
+        top = np.argsort(-counts, kind="stable")[:n]
+        rows.extend(catalog.keys.rows_of(cf_model.item_ids[top]))
+    rows = pd.unique(np.asarray(rows, dtype=np.int64))
+    return rows[rows >= 0][:n]
+
+def warm_up(catalog, cb_model, cf_model, n: int = WARM_SEEDS, topn: int = DEFAULT_TOPN) -> int:
+    """Precompute the default view (topn, hybrid when a CF model exists) for popular seeds."""
+    cache, versions, hybrid = rec_cache(), model_version(cb_model, cf_model), cf_model is not None
+    ids = catalog.games["id"].to_numpy()
+    done = 0
+    for row in popular_seeds(catalog, cf_model, n):
+        key = _key(catalog, versions, str(ids[row]), topn, hybrid)
+        if key not in cache:
+            cache.put(key, _pack(_compute(catalog, cb_model, cf_model, int(row), topn, hybrid)))
+            done += 1
+    return done
+
+@st.cache_resource(show_spinner=False)
+def _warm_once(catalog_version: str, versions: str, _catalog, _cb_model, _cf_model) -> threading.Thread:
+    # keyed by the versions only: one background warm-up per process per catalog / model build
+    t = threading.Thread(target=warm_up, args=(_catalog, _cb_model, _cf_model), name="rec-warmup", daemon=True)
+    t.start()
+    return t
+
+def start_warm_up(catalog, cb_model, cf_model):
+    if WARM_SEEDS > 0 and cb_model is not None:
+        _warm_once(catalog.version, model_version(cb_model, cf_model), catalog, cb_model, cf_model)
+
+def render_cache_stats():
+    s = rec_cache().stats()
+    st.caption(f"Recommendation cache: {s['entries']:,} entries ({s['bytes'] / (1 << 20):.1f} MB), "
+               f"hit ratio {s['hit_ratio']:.0%} ({s['hits']:,} hits / {s['misses']:,} misses), "
+               f"{s['evictions']:,} evicted, {s['expirations']:,} expired")
@@ -1,94 +1,102 @@
+# import_metadata.py — sync game_metadata.csv into the game_metadata table incrementally
+#   python import_metadata.py [--csv game_metadata.csv] [--dry-run] [--keep-missing]
+# Each row is hashed and compared with the stored row_hash; only inserts, updates
+# and deletes are written, in one transaction, so readers never see a partial or
+# empty catalog. A real change bumps catalog_version, which data.source_version()
+# polls to reload the app's catalog snapshot.
+import argparse
+import time
+import numpy as np
 import pandas as pd
-import mysql.connector
-from mysql.connector import Error
-
-import os
-from dotenv import load_dotenv
-
-load_dotenv()  # Tự động đọc file .env trong thư mục hiện tại
-
-DB_CFG = {
-    "host": os.getenv("MYSQL_ADDON_HOST"),
-    "port": int(os.getenv("MYSQL_ADDON_PORT", 3306)),
-    "user": os.getenv("MYSQL_ADDON_USER"),
-    "password": os.getenv("MYSQL_ADDON_PASSWORD"),
-    "database": os.getenv("MYSQL_ADDON_DB"),
-}
 
+import db
+from migrations import migrate
+from utils.ingest_utils import GAME_METADATA, coerce, summarize, to_params, write_rejects
 
 TABLE = "game_metadata"
 CSV_PATH = "game_metadata.csv"
-
-def to_int_or_none(x):
-    try:
-        return int(float(x))
-    except Exception:
-        return None
-
-def to_float_or_none(x):
-    try:
-        return float(x)
-    except Exception:
-        return None
-
-def to_str_or_none(x):
-    if pd.isna(x): 
-        return None
-    s = str(x).strip()
-    return s if s else None
-
-def main():
-    conn = mysql.connector.connect(**CFG)
+COLS = GAME_METADATA.names
+BATCH_ROWS = 500        # 10 params per row
+
+_UPDATES = ", ".join(f"{c}=VALUES({c})" for c in COLS[1:] + ["row_hash"])
+_EXCLUDED = ", ".join(f"{c}=excluded.{c}" for c in COLS[1:] + ["row_hash"])
+UPSERT_SQL = {
+    "mysql": f"INSERT INTO {TABLE} ({', '.join(COLS)}, row_hash) VALUES {{values}} ON DUPLICATE KEY UPDATE {_UPDATES}",
+    "sqlite": f"INSERT INTO {TABLE} ({', '.join(COLS)}, row_hash) VALUES {{values}} "
+              f"ON CONFLICT(game_id) DO UPDATE SET {_EXCLUDED}",
+}
+BUMP_SQL = "UPDATE catalog_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1"
+
+def row_hashes(games: pd.DataFrame) -> np.ndarray:
+    """Stable 64-bit content hash per row (signed, to fit a BIGINT / SQLite INTEGER)."""
+    # fixed widths: coerce() picks the narrowest int dtype per file, which would change the hash
+    frame = games[COLS].astype({"game_id": np.int64, "rating": np.float64})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+def plan(games: pd.DataFrame, stored: pd.DataFrame, keep_missing: bool = False):
+    """Split into (rows to insert, rows to update, game_ids to delete)."""
+    ids = pd.Index(stored["game_id"].astype(np.int64))
+    old = stored["row_hash"].to_numpy(dtype=np.int64)
+    pos = ids.get_indexer(games["game_id"])
+    exists = pos >= 0
+    changed = np.zeros(len(games), dtype=bool)
+    changed[exists] = old[pos[exists]] != games["row_hash"].to_numpy()[exists]
+    gone = np.empty(0, dtype=np.int64) if keep_missing else ids[~ids.isin(games["game_id"])].to_numpy()
+    return games[~exists], games[changed], gone
+
+def apply_changes(conn, upserts: pd.DataFrame, deletes: np.ndarray):
     cur = conn.cursor()
-
-    cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
-
-    cur.execute(f"""
-        CREATE TABLE {TABLE} (
-            game_id INT PRIMARY KEY,
-            name VARCHAR(255),
-            description MEDIUMTEXT,
-            genres TEXT,
-            platforms TEXT,
-            rating FLOAT,
-            released VARCHAR(50),
-            cover_image VARCHAR(1024),
-            game_link VARCHAR(1024)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-    """)
-    conn.commit()
-
-    df = pd.read_csv(CSV_PATH)
-    df.columns = [c.strip().lower() for c in df.columns]
-
-    df["game_id"] = df["game_id"].map(to_int_or_none)
-    df["rating"]  = df["rating"].map(to_float_or_none)
-
-    for c in ["name","description","genres","platforms","released","cover_image","game_link"]:
-        df[c] = df[c].map(to_str_or_none)
-
-    before = len(df)
-    df = df.dropna(subset=["game_id"])
-    print(f"Giữ {len(df)}/{before} dòng sau khi làm sạch.")
-
-    rows = list(df[["game_id","name","description","genres","platforms",
-                    "rating","released","cover_image","game_link"]]
-                .itertuples(index=False, name=None))
-
-    if rows:
-        sql = f"""
-            INSERT INTO {TABLE}
-            (game_id,name,description,genres,platforms,rating,released,cover_image,game_link)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-        """
-        cur.executemany(sql, rows)
-        conn.commit()
-        print(f"Import thành công {len(rows)} dòng vào {TABLE}")
-    else:
-        print("Không có dữ liệu hợp lệ để import.")
-
-    cur.close()
-    conn.close()
+    try:
+        params = to_params(upserts, COLS + ["row_hash"])
+        width = len(COLS) + 1
+        for start in range(0, len(params), BATCH_ROWS):
+            batch = params[start:start + BATCH_ROWS]
+            values = ",".join(["(" + ",".join(["%s"] * width) + ")"] * len(batch))
+            cur.execute(conn.sql(UPSERT_SQL[conn.backend].format(values=values)), batch.ravel().tolist())
+        for start in range(0, len(deletes), BATCH_ROWS):
+            batch = deletes[start:start + BATCH_ROWS].tolist()
+            cur.execute(conn.sql(f"DELETE FROM {TABLE} WHERE game_id IN ({','.join(['%s'] * len(batch))})"), batch)
+        cur.execute(BUMP_SQL)
+    finally:
+        cur.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Incrementally sync a metadata CSV into game_metadata.")
+    ap.add_argument("--csv", default=CSV_PATH)
+    ap.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    ap.add_argument("--keep-missing", action="store_true", help="do not delete games absent from the CSV")
+    ap.add_argument("--rejects", default=None, help="write rejected rows (with a reason column) to this CSV")
+    args = ap.parse_args(argv)
+
+    migrate(verbose=True)
+    t0 = time.perf_counter()
+    result = coerce(pd.read_csv(args.csv, dtype=str, encoding_errors="ignore"), GAME_METADATA)
+    print(f"{args.csv}: {summarize(result)}")
+    if args.rejects:
+        write_rejects(result.rejected, args.rejects)
+    games = result.frame
+    games["row_hash"] = row_hashes(games)
+    # NULL hashes (rows loaded before row_hash existed) become 0 so the column stays an exact int64
+    stored = db.read_frame(f"SELECT game_id, COALESCE(row_hash, 0) AS row_hash FROM {TABLE}", timeout=None)
+    inserts, updates, deletes = plan(games, stored, args.keep_missing)
+    print(f"{len(games):,} games, {len(stored):,} stored: "
+          f"{len(inserts):,} new, {len(updates):,} changed, {len(deletes):,} removed "
+          f"({time.perf_counter() - t0:.1f}s)")
+    if args.dry_run:
+        return 0
+    if games.empty and len(stored):
+        print(f"Refusing to delete all {len(stored):,} stored games: {args.csv} has no valid rows.")
+        return 1
+    if not (len(inserts) or len(updates) or len(deletes)):
+        print("Catalog is up to date.")
+        return 0
+
+    t0 = time.perf_counter()
+    with db.connection(timeout=None) as conn:
+        apply_changes(conn, pd.concat([inserts, updates]), deletes)
+    version = db.query("SELECT version FROM catalog_version WHERE id = 1", one=True)
+    print(f"Synced {TABLE} in {time.perf_counter() - t0:.1f}s; catalog version {version[0] if version else '?'}")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -1,74 +1,199 @@
-import pandas as pd
-import mysql.connector
-from mysql.connector import Error
-
+# import_ratings.py — stream game_ratings.csv into the game_ratings table in chunks, resumably
+#   python import_ratings.py [--csv game_ratings.csv] [--chunk-rows 100000] [--workers 2]
+#   python import_ratings.py --method load-data       # MySQL LOAD DATA LOCAL INFILE (needs DB_LOCAL_INFILE=1)
+#   python import_ratings.py --replace                # empty the table first (ignored when resuming)
+# Rows are upserted, so re-running a chunk after a crash is harmless; progress is
+# checkpointed to <csv>.ckpt.json (byte offset of the last fully written chunk).
+import argparse
+import io
+import json
 import os
-from dotenv import load_dotenv
-
-load_dotenv()  # Tự động đọc file .env trong thư mục hiện tại
-
-DB_CFG = {
-    "host": os.getenv("MYSQL_ADDON_HOST"),
-    "port": int(os.getenv("MYSQL_ADDON_PORT", 3306)),
-    "user": os.getenv("MYSQL_ADDON_USER"),
-    "password": os.getenv("MYSQL_ADDON_PASSWORD"),
-    "database": os.getenv("MYSQL_ADDON_DB"),
-}
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
 
+import db
+from migrations import migrate
+from utils.ingest_utils import GAME_RATINGS, coerce, to_params, write_rejects
 
 TABLE = "game_ratings"
 CSV_PATH = "game_ratings.csv"
-
-def to_int_or_none(x):
-    try:
-        return int(float(x))
-    except Exception:
-        return None
-
-def to_str_or_none(x):
-    if pd.isna(x):
-        return None
-    s = str(x).strip()
-    return s if s else None
-
-def main():
-    conn = mysql.connector.connect(**CFG)
+COLS = GAME_RATINGS.names
+CHUNK_ROWS = 100_000
+BATCH_ROWS = 1_000      # rows per multi-row INSERT statement (3 params each, well under SQLite's limit)
+
+UPSERT_SQL = {
+    "mysql": "INSERT INTO game_ratings (game_id, user_id, rating) VALUES {values} "
+             "ON DUPLICATE KEY UPDATE rating=VALUES(rating)",
+    "sqlite": "INSERT INTO game_ratings (game_id, user_id, rating) VALUES {values} "
+              "ON CONFLICT(game_id, user_id) DO UPDATE SET rating=excluded.rating",
+}
+LOAD_DATA_SQL = ("LOAD DATA LOCAL INFILE %s REPLACE INTO TABLE game_ratings "
+                 "FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' (game_id, user_id, rating)")
+CLEAR_SQL = {"mysql": "TRUNCATE TABLE game_ratings", "sqlite": "DELETE FROM game_ratings"}
+
+def _read_chunks(path: str, offset: int, chunk_rows: int):
+    """Yield (DataFrame, end byte offset) per chunk of lines, starting at `offset` (0 = after the header)."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        if offset:
+            f.seek(offset)
+        while True:
+            lines = []
+            for _ in range(chunk_rows):
+                line = f.readline()
+                if not line:
+                    break
+                lines.append(line)
+            if not lines:
+                return
+            df = pd.read_csv(io.BytesIO(header + b"".join(lines)), dtype=str, encoding_errors="ignore")
+            yield df, f.tell()
+
+def _upsert(conn, rows: pd.DataFrame):
     cur = conn.cursor()
-
-    cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
-
-    cur.execute(f"""
-        CREATE TABLE {TABLE} (
-            game_id INT NOT NULL,
-            user_id VARCHAR(64) NOT NULL,
-            rating  INT NULL,
-            PRIMARY KEY (game_id, user_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-    """)
-    conn.commit()
-
-    df = pd.read_csv(CSV_PATH)
-    df.columns = [c.strip().lower() for c in df.columns]
-
-    df["game_id"] = df["game_id"].map(to_int_or_none)
-    df["user_id"] = df["user_id"].map(to_str_or_none)
-    df["rating"]  = df["rating"].map(to_int_or_none)
-
-    before = len(df)
-    df = df.dropna(subset=["game_id","user_id"])
-    print(f"Giữ {len(df)}/{before} dòng sau khi làm sạch.")
-
-    rows = list(df[["game_id","user_id","rating"]].itertuples(index=False, name=None))
-    if rows:
-        sql = f"INSERT INTO {TABLE} (game_id, user_id, rating) VALUES (%s, %s, %s)"
-        cur.executemany(sql, rows)
-        conn.commit()
-        print(f"Import thành công {len(rows)} dòng.")
+    try:
+        params = to_params(rows, COLS)
+        for start in range(0, len(params), BATCH_ROWS):
+            batch = params[start:start + BATCH_ROWS]
+            values = ",".join(["(%s,%s,%s)"] * len(batch))
+            cur.execute(conn.sql(UPSERT_SQL[conn.backend].format(values=values)), batch.ravel().tolist())
+    finally:
+        cur.close()
+
+def _load_data(conn, rows: pd.DataFrame):
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf-8", newline="\n") as f:
+        rows[COLS].to_csv(f, sep="\t", header=False, index=False, na_rep="\\N")
+    try:
+        cur = conn.cursor()
+        cur.execute(LOAD_DATA_SQL, (f.name,))
+        cur.close()
+    finally:
+        os.unlink(f.name)
+
+def write_chunk(rows: pd.DataFrame, method: str):
+    if rows.empty:
+        return
+    with db.connection(timeout=None) as conn:
+        (_load_data if method == "load-data" else _upsert)(conn, rows)
+
+class Checkpoint:
+    """Byte offset of the last chunk written; with parallel writers only the contiguous prefix counts."""
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        st = os.stat(source)
+        self.source = {"path": os.path.abspath(source), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        self.offset = self.rows = self.rejected = 0
+        self._done: dict[int, tuple[int, int, int]] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if saved.get("source") != self.source:
+            print(f"Ignoring checkpoint {self.path}: the CSV changed since it was written.")
+            return False
+        self.offset, self.rows, self.rejected = saved["offset"], saved["rows"], saved["rejected"]
+        return True
+
+    def complete(self, seq: int, end: int, rows: int, rejected: int):
+        with self._lock:
+            self._done[seq] = (end, rows, rejected)
+            advanced = False
+            while self._next in self._done:
+                end, rows, rejected = self._done.pop(self._next)
+                self.offset, self.rows, self.rejected = end, self.rows + rows, self.rejected + rejected
+                self._next += 1
+                advanced = True
+            if advanced:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"source": self.source, "offset": self.offset, "rows": self.rows,
+                               "rejected": self.rejected, "updated_at": time.time()}, f)
+                os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stream a ratings CSV into game_ratings.")
+    ap.add_argument("--csv", default=CSV_PATH)
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="CSV lines per chunk / transaction")
+    ap.add_argument("--method", choices=("insert", "load-data"), default="insert",
+                    help="multi-row upserts, or MySQL LOAD DATA LOCAL INFILE ... REPLACE")
+    ap.add_argument("--workers", type=int, default=1, help="parallel writer connections (bounded by DB_POOL_SIZE)")
+    ap.add_argument("--replace", action="store_true", help="empty the table before a fresh (non-resumed) import")
+    ap.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    ap.add_argument("--checkpoint", default=None, help="checkpoint file (default <csv>.ckpt.json)")
+    ap.add_argument("--rejects", default=None, help="append rejected rows (with a reason column) to this CSV")
+    args = ap.parse_args(argv)
+    if args.method == "load-data" and db.dialect() != "mysql":
+        ap.error("--method load-data needs the MySQL backend")
+    if not os.path.exists(args.csv):
+        print(f"{args.csv} not found.")
+        return 1
+
+    migrate(verbose=True)
+    ckpt = Checkpoint(args.checkpoint or args.csv + ".ckpt.json", args.csv)
+    if args.restart:
+        ckpt.clear()
+    if ckpt.load():
+        print(f"Resuming at byte {ckpt.offset:,} ({ckpt.rows:,} rows already imported)")
+    elif args.replace:
+        db.execute(CLEAR_SQL[db.dialect()], timeout=None)
+
+    total = max(ckpt.source["size"], 1)
+    workers = max(1, min(args.workers, db.POOL_SIZE))
+    if workers > 1 and db.dialect() == "sqlite":
+        print("SQLite has a single writer; importing with one worker.")
+        workers = 1
+    t0, start_rows = time.perf_counter(), ckpt.rows
+
+    def report():
+        secs = time.perf_counter() - t0
+        print(f"  {ckpt.rows:,} rows ({100.0 * ckpt.offset / total:5.1f}%), {ckpt.rejected:,} rejected, "
+              f"{(ckpt.rows - start_rows) / max(secs, 1e-9):,.0f} rows/s", flush=True)
+
+    rejects_lock = threading.Lock()
+
+    def job(seq, chunk, end):
+        result = coerce(chunk, GAME_RATINGS)
+        write_chunk(result.frame, args.method)
+        if args.rejects and len(result.rejected):
+            with rejects_lock:
+                write_rejects(result.rejected, args.rejects, append=True)
+        ckpt.complete(seq, end, len(result.frame), len(result.rejected))
+
+    chunks = _read_chunks(args.csv, ckpt.offset, args.chunk_rows)
+    if workers == 1:
+        for seq, (chunk, end) in enumerate(chunks):
+            job(seq, chunk, end)
+            report()
     else:
-        print("Không có dữ liệu hợp lệ để import.")
-
-    cur.close()
-    conn.close()
+        # at most 2 chunks queued per writer keeps memory bounded to a few chunks
+        with ThreadPoolExecutor(workers) as pool:
+            pending = set()
+            for seq, (chunk, end) in enumerate(chunks):
+                pending.add(pool.submit(job, seq, chunk, end))
+                if len(pending) >= 2 * workers:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        fut.result()
+                    report()
+            for fut in pending:
+                fut.result()
+        report()
+    print(f"Imported {ckpt.rows:,} rows into {TABLE} in {time.perf_counter() - t0:.1f}s")
+    ckpt.clear()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
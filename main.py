@@ -1,4 +1,6 @@
 import streamlit as st
+import db
+from migrations import migrate, MigrationError
 from login import show_login
 from register import show_register
 from home import show_home
@@ -137,7 +139,16 @@ if "email" not in st.session_state:
 if "page" not in st.session_state:
     st.session_state.page = "login"
 
+@st.cache_resource(show_spinner=False)
+def _ensure_schema():
+    # once per process; a deploy normally runs `python -m migrations` beforehand
+    return migrate()
+
 def main():
+    try:
+        _ensure_schema()
+    except (MigrationError, *db.Error) as e:
+        st.error(f"Unable to connect to DB: {e}")
     if st.session_state.logged_in:
         st.session_state.page = "home"
         show_home()
@@ -0,0 +1,19 @@
+-- game catalog and player ratings (previously dropped and recreated by the importers)
+CREATE TABLE IF NOT EXISTS game_metadata (
+    game_id INT PRIMARY KEY,
+    name VARCHAR(255),
+    description MEDIUMTEXT,
+    genres TEXT,
+    platforms TEXT,
+    rating FLOAT,
+    released VARCHAR(50),
+    cover_image VARCHAR(1024),
+    game_link VARCHAR(1024)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS game_ratings (
+    game_id INT NOT NULL,
+    user_id VARCHAR(64) NOT NULL,
+    rating  INT NULL,
+    PRIMARY KEY (game_id, user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,19 @@
+-- game catalog and player ratings (previously dropped and recreated by the importers)
+CREATE TABLE IF NOT EXISTS game_metadata (
+    game_id INTEGER PRIMARY KEY,
+    name VARCHAR(255),
+    description TEXT,
+    genres TEXT,
+    platforms TEXT,
+    rating REAL,
+    released VARCHAR(50),
+    cover_image VARCHAR(1024),
+    game_link VARCHAR(1024)
+);
+
+CREATE TABLE IF NOT EXISTS game_ratings (
+    game_id INTEGER NOT NULL,
+    user_id VARCHAR(64) NOT NULL,
+    rating  INTEGER NULL,
+    PRIMARY KEY (game_id, user_id)
+);
@@ -0,0 +1,2 @@
+-- per-player lookups ("what has this user rated"); the primary key only serves game_id-first queries
+CREATE INDEX idx_game_ratings_user ON game_ratings (user_id);
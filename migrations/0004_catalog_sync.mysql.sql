@@ -0,0 +1,10 @@
+-- incremental catalog sync: per-row content hash, plus a version marker the app polls
+ALTER TABLE game_metadata ADD COLUMN row_hash BIGINT NULL;
+
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id INT PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT IGNORE INTO catalog_version (id, version) VALUES (1, 0);
@@ -0,0 +1,10 @@
+-- incremental catalog sync: per-row content hash, plus a version marker the app polls
+ALTER TABLE game_metadata ADD COLUMN row_hash INTEGER NULL;
+
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0);
@@ -0,0 +1,131 @@
+# migrations/__init__.py — versioned schema scripts applied once per database
+#
+#   python -m migrations            # apply pending migrations (deploy step)
+#   python -m migrations --status   # list applied / pending versions
+#
+# Scripts are NNNN_name.<dialect>.sql files in this folder; applied versions are
+# recorded in schema_version. The app calls migrate() once per process at startup,
+# which is a single SELECT when the schema is already current.
+from __future__ import annotations
+import os
+import re
+from typing import NamedTuple, Optional
+import db
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT = 60   # seconds to wait for another process's migration run
+
+VERSION_DDL = {
+    "mysql": """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    "sqlite": """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+}
+_FILE_RE = re.compile(r"^(\d+)_(\w+)\.(mysql|sqlite)\.sql$")
+_SPLIT_RE = re.compile(r";\s*$", re.MULTILINE)
+# MySQL has no CREATE INDEX / ADD COLUMN IF NOT EXISTS: duplicate key name, duplicate column
+_ER_ALREADY_APPLIED = {1061, 1060}
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: str
+
+    def statements(self) -> list[str]:
+        with open(self.path, encoding="utf-8") as f:
+            text = "\n".join(l for l in f.read().splitlines() if not l.lstrip().startswith("--"))
+        return [s.strip() for s in _SPLIT_RE.split(text) if s.strip()]
+
+class MigrationError(Exception):
+    pass
+
+def available(dialect: Optional[str] = None) -> list[Migration]:
+    dialect = dialect or db.dialect()
+    found = {}
+    for fname in os.listdir(MIGRATIONS_DIR):
+        m = _FILE_RE.match(fname)
+        if m and m.group(3) == dialect:
+            version = int(m.group(1))
+            if version in found:
+                raise MigrationError(f"duplicate migration version {version}: {fname}")
+            found[version] = Migration(version, m.group(2), os.path.join(MIGRATIONS_DIR, fname))
+    return [found[v] for v in sorted(found)]
+
+def current_version() -> Optional[int]:
+    """Highest applied version, 0 for an empty schema_version, None when the table is missing."""
+    try:
+        row = db.query("SELECT MAX(version) FROM schema_version", one=True)
+    except db.Error:
+        return None
+    return int(row[0] or 0) if row else 0
+
+def _applied(cur) -> set[int]:
+    cur.execute("SELECT version FROM schema_version")
+    return {int(r[0]) for r in cur.fetchall()}
+
+def _apply(conn, cur, mig: Migration):
+    for stmt in mig.statements():
+        try:
+            cur.execute(stmt)
+        except db.Error as e:
+            # a MySQL run that died half-way leaves its (auto-committed) DDL behind
+            if getattr(e, "errno", None) not in _ER_ALREADY_APPLIED:
+                raise MigrationError(f"migration {mig.version:04d}_{mig.name} failed: {e}") from e
+    cur.execute(conn.sql("INSERT INTO schema_version (version, name) VALUES (%s, %s)"), (mig.version, mig.name))
+    if conn.backend == "mysql":
+        conn.raw.commit()   # DDL is not transactional there; record each step as it lands
+
+def migrate(verbose: bool = False) -> list[Migration]:
+    """Apply pending migrations in order; returns the ones applied by this call.
+
+    Concurrent callers serialize on a MySQL named lock (SQLite: a write
+    transaction), and re-check the applied set once they hold it.
+    """
+    todo = available()
+    if not todo:
+        return []
+    current = current_version()
+    if current is not None and current >= todo[-1].version:
+        return []
+    done = []
+    with db.connection(timeout=None) as conn:
+        cur = conn.cursor()
+        try:
+            if conn.backend == "mysql":
+                cur.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT))
+                if (cur.fetchone() or [0])[0] != 1:
+                    raise MigrationError(f"another process held {LOCK_NAME!r} for over {LOCK_TIMEOUT}s")
+            else:
+                cur.execute("BEGIN IMMEDIATE")
+            cur.execute(VERSION_DDL[conn.backend])
+            applied = _applied(cur)
+            for mig in todo:
+                if mig.version in applied:
+                    continue
+                if verbose:
+                    print(f"applying {mig.version:04d}_{mig.name}")
+                _apply(conn, cur, mig)
+                done.append(mig)
+        finally:
+            if conn.backend == "mysql":
+                cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cur.fetchall()
+            cur.close()
+    return done
+
+def status() -> list[tuple[Migration, bool]]:
+    applied = set()
+    if current_version() is not None:
+        applied = {int(r[0]) for r in db.query("SELECT version FROM schema_version")}
+    return [(m, m.version in applied) for m in available()]
@@ -0,0 +1,24 @@
+# migrations/__main__.py — `python -m migrations [--status]`
+import argparse
+import db
+from migrations import migrate, status, MigrationError
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Apply the versioned database schema migrations.")
+    ap.add_argument("--status", action="store_true", help="list applied and pending migrations without applying")
+    args = ap.parse_args(argv)
+    print(f"database: {db.dialect()}")
+    try:
+        if args.status:
+            for mig, applied in status():
+                print(f"  {'applied' if applied else 'pending'}  {mig.version:04d}_{mig.name}")
+            return 0
+        done = migrate(verbose=True)
+    except (MigrationError, *db.Error) as e:
+        print(f"Migration failed: {e}")
+        return 1
+    print(f"{len(done)} migration(s) applied" if done else "Schema is up to date.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
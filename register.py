@@ -1,39 +1,18 @@
-import os
 import streamlit as st
 import hashlib
-import mysql.connector
-from mysql.connector import Error
-from dotenv import load_dotenv
-
-load_dotenv()
+import db
 
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode("utf-8")).hexdigest()
 
-DB_CFG = {
-    "host": os.getenv("MYSQL_ADDON_HOST"),
-    "port": int(os.getenv("MYSQL_ADDON_PORT", "3306")),
-    "user": os.getenv("MYSQL_ADDON_USER"),
-    "password": os.getenv("MYSQL_ADDON_PASSWORD"),
-    "database": os.getenv("MYSQL_ADDON_DB"),
-}
-
-def _get_conn():
-    return mysql.connector.connect(**DB_CFG)
-
 def create_user(username: str, password: str, email: str):
     try:
-        conn = _get_conn()
-        cur = conn.cursor()
-        cur.execute(
+        db.execute(
             "INSERT INTO users (username, password_hash, email) VALUES (%s, %s, %s)",
             (username, hash_password(password), email)
         )
-        conn.commit()
-        cur.close()
-        conn.close()
         return True
-    except Error as e:
+    except db.Error as e:
         st.error(f"Error: {e}")
         return False
 
@@ -0,0 +1,41 @@
+# tests/conftest.py — shared fixtures; every test runs against a throwaway SQLite file and catalog store
+#   python -m pytest -q
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# db reads its settings at import time: pin a local backend before anything imports it
+_TMP = tempfile.mkdtemp(prefix="vgr-tests-")
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["DB_SQLITE_PATH"] = os.path.join(_TMP, "app.db")
+os.environ["CATALOG_CACHE_DIR"] = os.path.join(_TMP, "catalog")
+
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def games_frame():
+    """A small raw catalog as data.load_games() returns it (string ids, HTML descriptions)."""
+    return pd.DataFrame({
+        "id": ["10", "11", "12", "13"],
+        "title": ["Doom", "doom", "Minecraft", "Quake"],
+        "genres": ["Action, Shooter", "action", "Sandbox, Survival", ""],
+        "platforms": ["PC", "PC, Xbox", "PC", "PC"],
+        "cover_image": ["", "", "http://x/mc.png", ""],
+        "description": ["<p>Demons&nbsp;on Mars</p>", "", "Blocks", "Arena"],
+        "rating": [4.5, None, 4.8, 4.1],
+        "released": ["1993-12-10", "TBA", "2011", "Jun 22, 1996"],
+        "game_link": ["", "", "", ""],
+    })
+
+@pytest.fixture
+def snapshot(games_frame):
+    import time
+    from catalog.compact import CompactCatalog
+    from catalog.snapshot import CatalogSnapshot
+    from catalog.text import prepare_games
+    compact = CompactCatalog.from_frame(prepare_games(games_frame.copy()))
+    return CatalogSnapshot(version="test", compact=compact, games=compact.keys(), loaded_at=time.time())
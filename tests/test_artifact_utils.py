@@ -0,0 +1,28 @@
+import os
+import numpy as np
+import pytest
+
+from utils.artifact_utils import ArtifactError, read_artifact, write_artifact
+
+def _builds(path):
+    return {f.split(".", 1)[0] for f in os.listdir(path) if f.endswith(".npy")}
+
+def test_roundtrip_and_kind_check(tmp_path):
+    write_artifact(str(tmp_path), "demo", arrays={"v": np.arange(3)}, texts={"ids": ["a", "é"]}, catalog_fingerprint="f")
+    art = read_artifact(str(tmp_path), "demo", expect_fingerprint="f")
+    assert art.array("v").tolist() == [0, 1, 2] and art.text("ids") == ["a", "é"]
+    with pytest.raises(ArtifactError):
+        read_artifact(str(tmp_path), "other")
+    with pytest.raises(ArtifactError):
+        read_artifact(str(tmp_path), "demo", expect_fingerprint="g")
+
+def test_previous_build_stays_readable_until_the_next(tmp_path):
+    path = str(tmp_path)
+    first = write_artifact(path, "demo", arrays={"v": np.arange(3)})["build_id"]
+    old = read_artifact(path, "demo")        # arrays are opened lazily, on access
+    second = write_artifact(path, "demo", arrays={"v": np.arange(5)})["build_id"]
+    assert _builds(path) == {first, second}
+    assert old.array("v").tolist() == [0, 1, 2]
+    third = write_artifact(path, "demo", arrays={"v": np.arange(7)})["build_id"]
+    assert _builds(path) == {second, third}
+    assert len(read_artifact(path, "demo").array("v")) == 7
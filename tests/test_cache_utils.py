@@ -0,0 +1,59 @@
+import numpy as np
+
+from utils import cache_utils
+from utils.cache_utils import ENTRY_OVERHEAD, LRUCache
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_evicts_least_recently_used_by_count():
+    c = LRUCache(max_entries=2)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1          # "b" is now the oldest
+    c.put("c", 3)
+    assert "b" not in c and "a" in c and "c" in c
+    assert c.stats()["evictions"] == 1
+
+def test_evicts_by_bytes_and_skips_oversized_values():
+    arr = np.zeros(100, dtype=np.float32)
+    size = arr.nbytes + ENTRY_OVERHEAD
+    c = LRUCache(max_entries=100, max_bytes=2 * size)
+    for k in "abc":
+        c.put(k, (arr, {"score": arr[:0]}))
+    assert c.stats()["entries"] == 2 and c.bytes == 2 * size and "a" not in c
+    c.put("big", np.zeros(10_000))
+    assert "big" not in c and c.bytes == 2 * size
+    c.put("b", arr)                 # replacing an entry re-counts its size
+    assert c.bytes == 2 * size
+    c.clear()
+    assert c.bytes == 0 and c.stats()["entries"] == 0
+
+def test_ttl_expiry_counts_as_a_miss(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_utils.time, "monotonic", clock)
+    c = LRUCache(ttl=10)
+    c.put("a", 1)
+    clock.now = 5
+    assert c.get("a") == 1
+    clock.now = 20
+    assert "a" not in c
+    assert c.get("a") is None
+    s = c.stats()
+    assert (s["hits"], s["misses"], s["expirations"], s["entries"]) == (1, 1, 1, 0)
+
+def test_get_or_compute_counts_and_tags():
+    c = LRUCache()
+    calls = []
+    compute = lambda: calls.append(1) or "rec"
+    for tag in ["10", "10", "11", "10"]:
+        assert c.get_or_compute(("cb", tag), compute, tag=tag) == "rec"
+    assert len(calls) == 2
+    s = c.stats()
+    assert (s["hits"], s["misses"]) == (2, 2) and s["hit_ratio"] == 0.5
+    assert c.popular(1) == ["10"] and c.popular(5) == ["10", "11"]
+    assert LRUCache().stats()["hit_ratio"] == 0.0
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from catalog import store
+from catalog.compact import CompactCatalog, DISPLAY_COLUMNS
+from catalog.index import FacetIndex
+from catalog.text import prepare_games
+
+def _compact(games_frame):
+    games = prepare_games(games_frame.copy())
+    return games, CompactCatalog.from_frame(games)
+
+def test_columns_match_prepared_frame(games_frame):
+    games, c = _compact(games_frame)
+    full = c.frame(DISPLAY_COLUMNS + ("combined_text",))
+    for col in ("title", "description_clean", "description_snippet", "combined_text", "cover_image"):
+        assert full[col].tolist() == games[col].tolist(), col
+    assert full["id"].tolist() == [10, 11, 12, 13] and c.ids.dtype == np.int32
+    assert full["genres"].tolist() == ["Action, Shooter", "action", "Sandbox, Survival", ""]
+    assert full["rating"].tolist()[0] == 4.5 and np.isnan(full["rating"].iat[1])
+
+def test_released_shows_source_values(games_frame):
+    _, c = _compact(games_frame)
+    assert c.column("released").tolist() == ["1993-12-10", "TBA", "2011", "Jun 22, 1996"]
+    assert c.column("released", np.array([3, 0])).tolist() == ["Jun 22, 1996", "1993-12-10"]
+
+def test_page_rows_keep_positions(games_frame):
+    _, c = _compact(games_frame)
+    page = c.frame(rows=[2, 0])
+    assert page.index.tolist() == [2, 0]
+    assert page["title"].tolist() == ["Minecraft", "Doom"]
+
+def test_facet_index_from_compact_matches_build(games_frame):
+    games, c = _compact(games_frame)
+    a, b = FacetIndex.from_compact(c), FacetIndex.build(games)
+    assert a.genres.vocabulary() == b.genres.vocabulary()
+    assert np.array_equal(a.mask(["Action"], ["PC"]), b.mask(["Action"], ["PC"]))
+
+def test_store_roundtrip_is_mmapped(games_frame, tmp_path):
+    _, c = _compact(games_frame)
+    assert store.write_store(c, "v1", root=str(tmp_path))
+    assert store.read_store("v2", root=str(tmp_path)) is None
+    back = store.read_store("v1", root=str(tmp_path))
+    assert isinstance(back.buf, np.memmap)
+    cols = DISPLAY_COLUMNS + ("combined_text",)
+    pd.testing.assert_frame_equal(back.frame(cols), c.frame(cols))
@@ -0,0 +1,49 @@
+import sqlite3
+import pytest
+
+import db
+
+def test_placeholders_translate_for_sqlite():
+    sqlite = db._Conn(sqlite3.connect(":memory:"), "sqlite")
+    assert sqlite.sql("SELECT * FROM t WHERE a=%s AND b=%s") == "SELECT * FROM t WHERE a=? AND b=?"
+    mysql = db._Conn(None, "mysql")
+    assert mysql.sql("SELECT %s") == "SELECT %s"
+
+def test_query_and_execute_roundtrip():
+    db.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v INTEGER)")
+    db.execute("INSERT INTO kv (k, v) VALUES (%s, %s)", [("a", 1), ("b", 2)], many=True)
+    assert db.query("SELECT v FROM kv WHERE k=%s", ("b",), one=True)[0] == 2
+    assert db.query("SELECT k, v FROM kv WHERE k=%s", ("a",), one=True, dictionary=True) == {"k": "a", "v": 1}
+    assert db.read_frame("SELECT k FROM kv ORDER BY k")["k"].tolist() == ["a", "b"]
+
+def test_failed_transaction_rolls_back():
+    db.execute("CREATE TABLE IF NOT EXISTS tx (n INTEGER)")
+    with pytest.raises(RuntimeError):
+        with db.connection() as conn:
+            conn.cursor().execute("INSERT INTO tx (n) VALUES (1)")
+            raise RuntimeError("boom")
+    assert db.query("SELECT COUNT(*) FROM tx", one=True)[0] == 0
+
+class _Stale(sqlite3.OperationalError):
+    pass
+
+def _flaky(calls):
+    def fn(conn):
+        calls.append(1)
+        if len(calls) == 1:
+            raise _Stale("connection lost")
+        return "ok"
+    return fn
+
+def test_reads_retry_on_a_lost_connection(monkeypatch):
+    monkeypatch.setattr(db, "_is_stale", lambda e: isinstance(e, _Stale))
+    calls = []
+    assert db._run(_flaky(calls), timeout=None, retry=True) == "ok"
+    assert len(calls) == 2
+
+def test_writes_are_never_replayed(monkeypatch):
+    monkeypatch.setattr(db, "_is_stale", lambda e: isinstance(e, _Stale))
+    calls = []
+    with pytest.raises(_Stale):
+        db._run(_flaky(calls), timeout=None)
+    assert len(calls) == 1
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.ingest_utils import GAME_METADATA, GAME_RATINGS, coerce, summarize, to_params
+
+def test_headers_and_aliases_are_normalized():
+    df = pd.DataFrame({" ItemID ": ["1", "2"], "Title": [" Doom ", ""], "Summary": ["x", None]})
+    res = coerce(df, GAME_METADATA)
+    assert list(res.frame.columns) == GAME_METADATA.names
+    assert res.frame["game_id"].tolist() == [1, 2]
+    assert res.frame["name"].tolist() == ["Doom", None]       # stripped; "" is null, never "nan"
+    assert res.frame["description"].tolist() == ["x", None]
+
+def test_bad_required_values_are_rejected_with_a_reason():
+    df = pd.DataFrame({"game_id": ["1", "abc", None, "4"], "user_id": ["u", "u", "u", " "], "rating": [5, 4, 3, 2]})
+    res = coerce(df, GAME_RATINGS)
+    assert res.frame["game_id"].tolist() == [1]
+    assert res.rejected["reason"].tolist() == ["game_id: invalid", "game_id: missing", "user_id: missing"]
+    assert "1 rows kept 3 rejected" in summarize(res)
+
+def test_duplicate_keys_keep_the_last_row():
+    df = pd.DataFrame({"game_id": [7, 7, 8], "user_id": ["a", "a", "a"], "rating": [1, 5, 3]})
+    res = coerce(df, GAME_RATINGS)
+    assert res.frame["rating"].tolist() == [5, 3]
+    assert res.rejected["reason"].tolist() == ["duplicate key (a later row wins)"]
+
+def test_unparseable_optional_values_become_null_and_are_counted():
+    df = pd.DataFrame({"id": [1, 2, 3], "rating": ["4.5", "great", None]})
+    res = coerce(df, GAME_METADATA)
+    assert len(res.rejected) == 0
+    assert res.frame["rating"].iloc[0] == 4.5 and res.frame["rating"].iloc[1:].isna().all()
+    assert res.nulled == {"rating": 1}
+
+def test_ints_use_the_narrowest_dtype():
+    df = pd.DataFrame({"game_id": [1, 300], "user_id": ["a", "b"], "rating": [4.9, None]})
+    frame = coerce(df, GAME_RATINGS).frame
+    assert frame["game_id"].dtype == np.int16
+    assert str(frame["rating"].dtype) == "Int8" and frame["rating"].iloc[0] == 4   # truncated, NA kept
+
+def test_missing_required_column_raises():
+    with pytest.raises(ValueError, match="game_id"):
+        coerce(pd.DataFrame({"title": ["Doom"]}), GAME_METADATA)
+
+def test_to_params_uses_python_scalars_and_none():
+    df = pd.DataFrame({"game_id": [1, 2], "user_id": ["a", "b"], "rating": [5, None]})
+    params = to_params(coerce(df, GAME_RATINGS).frame)
+    assert params.tolist() == [[1, "a", 5], [2, "b", None]]
+    assert to_params(pd.DataFrame({"a": []})).shape == (0, 1)
+
+def test_app_load_logs_rejected_rows(caplog):
+    from data import _games_frame
+    games = _games_frame(pd.DataFrame({"id": ["1", "n/a"], "title": ["Doom", "Quake"]}), "games.csv")
+    assert games["id"].tolist() == ["1"]
+    assert "games.csv: 1 rows kept 1 rejected (game_id: invalid: 1)" in caplog.text
+    assert _games_frame(pd.DataFrame({"title": ["Doom"]}), "games.csv").empty
+    assert "missing required columns ['game_id']" in caplog.text
@@ -0,0 +1,43 @@
+import pytest
+
+import db
+import migrations
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    # each test starts from an empty SQLite file, not the session-wide one
+    db.close_pool()
+    monkeypatch.setattr(db, "SQLITE_PATH", str(tmp_path / "fresh.db"))
+    yield
+    db.close_pool()
+
+def _tables():
+    return {r[0] for r in db.query("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+
+def test_scripts_are_ordered_and_split():
+    found = migrations.available("sqlite")
+    assert [m.version for m in found] == list(range(1, len(found) + 1))
+    assert {m.version for m in migrations.available("mysql")} == {m.version for m in found}
+    assert all(m.statements() and not any(s.endswith(";") for s in m.statements()) for m in found)
+
+def test_migrate_applies_everything_once(fresh_db):
+    assert migrations.current_version() is None
+    done = migrations.migrate()
+    latest = migrations.available()[-1].version
+    assert [m.version for m in done] == list(range(1, latest + 1))
+    assert migrations.current_version() == latest
+    assert {"users", "game_metadata", "game_ratings", "catalog_version", "idx_game_ratings_user"} <= _tables()
+    assert "row_hash" in db.read_frame("SELECT * FROM game_metadata").columns
+
+    assert migrations.migrate() == []
+    assert all(applied for _, applied in migrations.status())
+
+def test_migrate_resumes_from_the_recorded_version(fresh_db):
+    migrations.migrate()
+    db.execute("DELETE FROM schema_version WHERE version = %s", (4,))
+    db.execute("CREATE TABLE game_metadata_new AS SELECT game_id FROM game_metadata")
+    db.execute("DROP TABLE game_metadata")
+    db.execute("ALTER TABLE game_metadata_new RENAME TO game_metadata")
+    assert [applied for _, applied in migrations.status()][-1] is False
+    assert [m.version for m in migrations.migrate()] == [4]
+    assert "row_hash" in db.read_frame("SELECT * FROM game_metadata").columns
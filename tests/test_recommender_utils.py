@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from catalog.keys import KeyIndex
+from utils import recommender_utils as ru
+from utils.cf_utils import ALSModel
+from utils.recommender_utils import _positions_of, catalog_fingerprint
+
+def test_positions_of_tolerates_repeated_ids():
+    games = pd.DataFrame({"id": ["5", "6", "5"], "title": ["a", "b", "c"]}, index=[9, 8, 7])
+    assert _positions_of(games, ["6", "5", "x"]).tolist() == [1, 0, -1]
+    assert _positions_of(games, [6], keys=KeyIndex.build(games)).tolist() == [1]
+
+def test_fingerprint_ignores_id_dtype():
+    games = pd.DataFrame({"id": ["1", "2"], "title": ["a", "b"], "combined_text": ["x", "y"]})
+    assert catalog_fingerprint(games) == catalog_fingerprint(games.astype({"id": np.int32}))
+
+def test_hybrid_candidates_come_from_the_neighbor_table(monkeypatch):
+    n = 30
+    games = pd.DataFrame({"id": [str(i) for i in range(n)], "title": [f"g{i}" for i in range(n)],
+                          "combined_text": [f"tag{i % 5} kind{i % 3} common" for i in range(n)]})
+    cb = ru.build_cb_index(games)
+    cb["neighbors"] = ru.build_neighbor_table(cb, k=8)
+    rng = np.random.default_rng(0)
+    cf = ALSModel(rng.standard_normal((2, 4)), rng.standard_normal((n, 4)), ["u1", "u2"], games["id"], None, {})
+    lookups = []
+    lookup = ru.NeighborTable.lookup
+    monkeypatch.setattr(ru.NeighborTable, "lookup", lambda self, row, topn: lookups.append(topn) or lookup(self, row, topn))
+    rec = ru.get_hybrid_recommendations(cb, cf, games, "g0", topn=5, n_candidates=ru.HYBRID_CANDIDATES)
+    assert lookups == [8]
+    assert len(rec) == 5 and "g0" not in rec["title"].tolist()
+
+def test_batch_scores_are_cosines_without_renormalizing():
+    games = pd.DataFrame({"id": [str(i) for i in range(12)], "title": [f"g{i}" for i in range(12)],
+                          "combined_text": [f"tag{i % 4} kind{i % 3} common extra{i % 2}" for i in range(12)]})
+    cb = ru.build_cb_index(games)
+    from sklearn.metrics.pairwise import cosine_similarity
+    cos = cosine_similarity(cb["matrix"])
+    rows, scores = ru.score_cb_batch(cb, [0, 5], topn=3)
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, np.take_along_axis(cos[[0, 5]], rows, axis=1), rtol=1e-5)
+    order, sim = ru._cb_neighbors(cb, games, 5, 3, "combined_text")
+    np.testing.assert_allclose(sim, scores[1], rtol=1e-5)
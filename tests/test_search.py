@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from catalog.search import SearchIndex
+
+def _index():
+    return SearchIndex.build(pd.DataFrame({
+        "title": ["Minecraft", "Zombie Farm", "Space Pirates", "Crafting Life"],
+        "description_clean": ["blocks", "co-op zombie survival", "pirates in space", "cozy farming"],
+    }))
+
+def test_words_and_last_word_prefix():
+    idx = _index()
+    assert idx.search("zombie").tolist() == [1]
+    assert idx.search("space pir").tolist()[0] == 2
+    assert set(idx.search("farm").tolist()) == {1, 3}
+
+def test_title_substrings_follow_ranked_matches():
+    idx = _index()
+    # "craft" prefixes "crafting" (ranked) and is a substring of "Minecraft" (appended)
+    assert idx.search("craft").tolist() == [3, 0]
+    assert idx.search("ecraf").tolist() == [0]
+    assert idx.search("necraft", rows=np.array([1, 2])).tolist() == []
+    assert idx.search("qqq").tolist() == []
+
+def test_repeated_substring_counts_each_title_once():
+    idx = _index()
+    # "a" occurs twice in "Space Pirates"; regex specials are literal
+    assert idx._title_hits("a").tolist() == [0, 1, 2, 3]
+    assert idx._title_hits("i.").tolist() == []
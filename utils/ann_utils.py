@@ -0,0 +1,116 @@
+# utils/ann_utils.py — IVF approximate nearest-neighbour index over reduced CB vectors
+from __future__ import annotations
+import time
+import numpy as np
+
+DEFAULT_DIM = 128
+DEFAULT_NPROBE = 8
+
+def _normalize(V: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(V, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (V / norms).astype(np.float32, copy=False)
+
+def _assign(V: np.ndarray, C: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    out = np.empty(len(V), dtype=np.int32)
+    for lo in range(0, len(V), chunk):
+        out[lo:lo + chunk] = np.argmax(V[lo:lo + chunk] @ C.T, axis=1)
+    return out
+
+def _spherical_kmeans(V: np.ndarray, k: int, n_iter: int, rng: np.random.Generator) -> np.ndarray:
+    from scipy import sparse
+    C = V[rng.choice(len(V), k, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = _assign(V, C)
+        onehot = sparse.csr_matrix((np.ones(len(V), dtype=np.float32), (assign, np.arange(len(V)))), shape=(k, len(V)))
+        sums = np.asarray(onehot @ V)
+        empty = np.flatnonzero(np.asarray(onehot.sum(axis=1)).ravel() == 0)
+        sums[empty] = V[rng.choice(len(V), len(empty), replace=False)]
+        C = _normalize(sums)
+    return C
+
+class IVFIndex:
+    """Inverted-file index: vectors are bucketed by nearest centroid and a query
+    scans only the `nprobe` closest buckets. Raising nprobe trades latency for
+    recall; nprobe == n_lists is exact search over the reduced vectors."""
+
+    def __init__(self, vectors: np.ndarray, centroids: np.ndarray, list_offsets: np.ndarray,
+                 list_rows: np.ndarray, meta: dict):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+        self.meta = meta
+
+    @property
+    def n_rows(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def fingerprint(self) -> str | None:
+        return self.meta.get("catalog_fingerprint")
+
+    @classmethod
+    def build(cls, X, dim: int = DEFAULT_DIM, n_lists: int | None = None, n_iter: int = 10,
+              sample: int = 100_000, seed: int = 0, fingerprint: str | None = None) -> "IVFIndex":
+        from sklearn.decomposition import TruncatedSVD
+        n = X.shape[0]
+        rng = np.random.default_rng(seed)
+        dim = max(1, min(dim, X.shape[1] - 1, n - 1))
+        V = _normalize(TruncatedSVD(n_components=dim, random_state=seed).fit_transform(X))
+        n_lists = max(1, min(n_lists or int(4 * np.sqrt(n)), n))
+        train = V[rng.choice(n, min(n, max(sample, n_lists)), replace=False)]
+        C = _spherical_kmeans(train, n_lists, n_iter, rng)
+        assign = _assign(V, C)
+        rows = np.argsort(assign, kind="stable").astype(np.int32)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=offsets[1:])
+        meta = {"dim": dim, "n_lists": n_lists, "n_rows": n, "nprobe": DEFAULT_NPROBE, "built_at": time.time()}
+        if fingerprint:
+            meta["catalog_fingerprint"] = fingerprint
+        return cls(V, C, offsets, rows, meta)
+
+    def _candidates(self, q: np.ndarray, nprobe: int) -> np.ndarray:
+        nprobe = max(1, min(nprobe, self.n_lists))
+        cs = self.centroids @ q
+        probe = np.argpartition(-cs, nprobe - 1)[:nprobe] if nprobe < self.n_lists else np.arange(self.n_lists)
+        return np.concatenate([self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe])
+
+    def query(self, row: int, k: int = 10, nprobe: int | None = None, exact: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) of the k nearest neighbours of `row`, best first, excluding itself."""
+        q = np.asarray(self.vectors[row])
+        cand = np.arange(self.n_rows) if exact else self._candidates(q, nprobe or self.meta.get("nprobe", DEFAULT_NPROBE))
+        cand = cand[cand != row]
+        scores = np.asarray(self.vectors[cand]) @ q
+        k = min(k, len(cand))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return cand[top].astype(np.int64), scores[top]
+
+    def recall(self, rows, k: int = 10, nprobe: int | None = None, truth=None) -> float:
+        """Mean recall@k of ANN results against exact search (or a given truth table)."""
+        hits = 0
+        total = 0
+        for i, r in enumerate(rows):
+            got, _ = self.query(int(r), k, nprobe)
+            want = truth[i][:k] if truth is not None else self.query(int(r), k, exact=True)[0]
+            want = np.asarray(want)
+            want = want[want >= 0]
+            hits += len(np.intersect1d(got, want))
+            total += len(want)
+        return hits / total if total else 1.0
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {"vectors": self.vectors, "centroids": self.centroids,
+                "list_offsets": self.list_offsets, "list_rows": self.list_rows}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, meta: dict) -> "IVFIndex":
+        return cls(arrays["vectors"], np.asarray(arrays["centroids"]), np.asarray(arrays["list_offsets"]),
+                   arrays["list_rows"], meta)
@@ -0,0 +1,150 @@
+# utils/artifact_utils.py — versioned, memory-mappable model artifacts
+#
+# An artifact is a directory:
+#   manifest.json                  format, version, params, catalog fingerprint, file list
+#   <build>.<name>.npy             dense arrays (mmapped on load)
+#   <build>.<name>.{data,indices,indptr}.npy   CSR matrices
+#   <build>.<name>.{bytes,offsets}.npy         string lists (utf-8 buffer + offsets)
+# Array files carry a build id so a new build never overwrites files that a
+# running process still has mapped; manifest.json is replaced atomically last.
+# Arrays load lazily, so the previous build's files are kept until the next
+# build: a process still holding the old manifest can go on reading them.
+from __future__ import annotations
+import json
+import os
+import time
+import uuid
+import numpy as np
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+class ArtifactError(Exception):
+    pass
+
+def _encode_texts(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    enc = [str(v).encode("utf-8") for v in values]
+    offsets = np.zeros(len(enc) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, enc), dtype=np.int64, count=len(enc)), out=offsets[1:])
+    return np.frombuffer(b"".join(enc), dtype=np.uint8), offsets
+
+def _build_id(path: str) -> str | None:
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            return json.load(f).get("build_id")
+    except (OSError, ValueError):
+        return None
+
+def write_artifact(path: str, kind: str, *, arrays: dict | None = None, sparse: dict | None = None,
+                   texts: dict | None = None, params: dict | None = None,
+                   catalog_fingerprint: str | None = None, meta: dict | None = None) -> dict:
+    os.makedirs(path, exist_ok=True)
+    build = uuid.uuid4().hex[:12]
+    previous = _build_id(path)
+    files: dict[str, dict] = {}
+
+    def put(name: str, arr: np.ndarray):
+        fname = f"{build}.{name}.npy"
+        np.save(os.path.join(path, fname), np.ascontiguousarray(arr))
+        files[name] = {"file": fname, "dtype": str(arr.dtype), "shape": list(arr.shape)}
+
+    for name, arr in (arrays or {}).items():
+        put(name, np.asarray(arr))
+    sparse_info = {}
+    for name, X in (sparse or {}).items():
+        X = X.tocsr()
+        put(f"{name}.data", X.data)
+        put(f"{name}.indices", X.indices)
+        put(f"{name}.indptr", X.indptr)
+        sparse_info[name] = {"format": "csr", "shape": list(X.shape)}
+    for name, values in (texts or {}).items():
+        buf, offsets = _encode_texts(values)
+        put(f"{name}.bytes", buf)
+        put(f"{name}.offsets", offsets)
+    manifest = {
+        "kind": kind,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "build_id": build,
+        "created_at": time.time(),
+        "catalog_fingerprint": catalog_fingerprint,
+        "params": params or {},
+        "meta": meta or {},
+        "files": files,
+        "sparse": sparse_info,
+        "texts": sorted((texts or {}).keys()),
+    }
+    tmp = os.path.join(path, f".{MANIFEST}.{build}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+    keep = {build, previous}
+    for entry in os.listdir(path):
+        if entry.endswith(".npy") and entry.split(".", 1)[0] not in keep:
+            try:
+                os.remove(os.path.join(path, entry))
+            except OSError:
+                pass
+    return manifest
+
+def manifest_stamp(path: str) -> float:
+    return os.path.getmtime(os.path.join(path, MANIFEST))
+
+class Artifact:
+    def __init__(self, path: str, manifest: dict, mmap: bool = True):
+        self.path = path
+        self.manifest = manifest
+        self._mode = "r" if mmap else None
+
+    @property
+    def params(self) -> dict:
+        return self.manifest.get("params", {})
+
+    @property
+    def meta(self) -> dict:
+        return self.manifest.get("meta", {})
+
+    @property
+    def fingerprint(self) -> str | None:
+        return self.manifest.get("catalog_fingerprint")
+
+    def has(self, name: str) -> bool:
+        files = self.manifest["files"]
+        return name in files or name in self.manifest["sparse"] or f"{name}.bytes" in files
+
+    def array(self, name: str) -> np.ndarray:
+        try:
+            info = self.manifest["files"][name]
+        except KeyError:
+            raise ArtifactError(f"{self.path}: no array '{name}'") from None
+        return np.load(os.path.join(self.path, info["file"]), mmap_mode=self._mode)
+
+    def sparse(self, name: str):
+        from scipy import sparse
+        info = self.manifest["sparse"][name]
+        parts = (self.array(f"{name}.data"), self.array(f"{name}.indices"), self.array(f"{name}.indptr"))
+        return sparse.csr_matrix(parts, shape=tuple(info["shape"]), copy=False)
+
+    def text(self, name: str) -> list[str]:
+        buf, offsets = self.array(f"{name}.bytes"), self.array(f"{name}.offsets")
+        raw = buf.tobytes()
+        off = offsets.tolist()
+        return [raw[a:b].decode("utf-8") for a, b in zip(off[:-1], off[1:])]
+
+def read_artifact(path: str, kind: str, expect_fingerprint: str | None = None, mmap: bool = True) -> Artifact:
+    """Open an artifact, rejecting other kinds, format versions or catalogs."""
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise ArtifactError(f"No artifact at {path}") from None
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Unreadable manifest in {path}: {e}") from e
+    if manifest.get("kind") != kind:
+        raise ArtifactError(f"{path} holds a '{manifest.get('kind')}' artifact, expected '{kind}'")
+    if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ArtifactError(f"{path} uses artifact format {manifest.get('format_version')}, "
+                            f"expected {ARTIFACT_FORMAT_VERSION}")
+    if expect_fingerprint is not None and manifest.get("catalog_fingerprint") != expect_fingerprint:
+        raise ArtifactError(f"{path} was built for catalog {manifest.get('catalog_fingerprint')}, "
+                            f"current catalog is {expect_fingerprint}")
+    return Artifact(path, manifest, mmap=mmap)
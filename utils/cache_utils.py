@@ -0,0 +1,96 @@
+# utils/cache_utils.py — thread-safe LRU + TTL cache of small array results, with hit / eviction counters
+from __future__ import annotations
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Hashable
+import numpy as np
+
+ENTRY_OVERHEAD = 512    # bytes charged per entry on top of its arrays (key, dict, tuple objects)
+
+def _nbytes(value) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 64
+
+class LRUCache:
+    """Bounded by entry count and by bytes; entries older than `ttl` seconds count as misses.
+
+    Values are treated as immutable: callers must not modify what get() returns.
+    """
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 64 << 20, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, int, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.requests: Counter = Counter()   # per-tag request counts (e.g. seed ids), for warm-up
+
+    def get(self, key: Hashable, tag: Hashable = None):
+        now = time.monotonic()
+        with self._lock:
+            if tag is not None:
+                self.requests[tag] += 1
+            entry = self._data.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, value):
+        size = _nbytes(value) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic(), size, value)
+            self.bytes += size
+            while len(self._data) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object], tag: Hashable = None):
+        value = self.get(key, tag)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and time.monotonic() - entry[0] <= self.ttl
+
+    def _drop(self, key: Hashable):
+        _, size, _ = self._data.pop(key)
+        self.bytes -= size
+
+    def popular(self, n: int) -> list:
+        with self._lock:
+            return [t for t, _ in self.requests.most_common(n)]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._data), "bytes": self.bytes, "hits": self.hits, "misses": self.misses,
+                    "hit_ratio": self.hits / lookups if lookups else 0.0,
+                    "evictions": self.evictions, "expirations": self.expirations}
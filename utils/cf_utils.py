@@ -0,0 +1,167 @@
+# utils/cf_utils.py — collaborative filtering: ALS matrix factorization on sparse ratings
+from __future__ import annotations
+import time
+import numpy as np
+import pandas as pd
+
+DEFAULT_FACTORS = 32
+DEFAULT_REG = 0.2
+DEFAULT_ITERS = 10
+DEFAULT_CG_STEPS = 3
+DEFAULT_MEMORY_MB = 256
+
+def build_interactions(ratings: pd.DataFrame):
+    """Sparse user x item rating matrix (float32 CSR) plus the user / item id arrays.
+
+    Duplicate (user, item) pairs keep the last rating.
+    """
+    from scipy import sparse
+    df = ratings.dropna(subset=["user_id", "game_id", "rating"])
+    u_codes, user_ids = pd.factorize(df["user_id"], sort=True)
+    i_codes, item_ids = pd.factorize(df["game_id"], sort=True)
+    shape = (len(user_ids), len(item_ids))
+    keys = u_codes.astype(np.int64) * shape[1] + i_codes
+    _, last = np.unique(keys[::-1], return_index=True)
+    keep = len(keys) - 1 - last
+    R = sparse.csr_matrix((df["rating"].to_numpy(np.float32)[keep], (u_codes[keep], i_codes[keep])), shape=shape)
+    R.sort_indices()
+    return R, np.asarray(user_ids).astype(str).astype(object), np.asarray(item_ids).astype(str).astype(object)
+
+def _gram_times(R, row_of, Y: np.ndarray, X: np.ndarray, chunk: int) -> np.ndarray:
+    """(Y_u^T Y_u) x_u for every row u of R, as one sparse x dense product."""
+    P = R.copy()
+    for lo in range(0, R.nnz, chunk):
+        P.data[lo:lo + chunk] = np.einsum("ij,ij->i", Y[R.indices[lo:lo + chunk]], X[row_of[lo:lo + chunk]])
+    return np.asarray(P @ Y)
+
+def _solve_side(R, Y: np.ndarray, X: np.ndarray, reg: float, cg_steps: int, memory_mb: float) -> np.ndarray:
+    """Refine the factors X of every row of R given the fixed column factors Y.
+
+    Each row's ridge system (Y_u^T Y_u + reg * n_u I) x = Y_u^T r_u is solved
+    by a few conjugate-gradient steps warm-started from the previous X, for
+    all rows at once: a step costs O(nnz * f) instead of forming f x f Grams.
+    """
+    counts = np.diff(R.indptr)
+    row_of = np.repeat(np.arange(R.shape[0], dtype=np.int32), counts)
+    chunk = max(1, int(memory_mb * 1024 * 1024) // (Y.shape[1] * 8))
+    lam = (reg * counts).astype(np.float32)[:, None]
+    X = X.copy()
+    r = np.asarray(R @ Y) - _gram_times(R, row_of, Y, X, chunk) - lam * X
+    p = r.copy()
+    rs = np.einsum("ij,ij->i", r, r)
+    for _ in range(cg_steps):
+        Ap = _gram_times(R, row_of, Y, p, chunk) + lam * p
+        denom = np.einsum("ij,ij->i", p, Ap)
+        alpha = np.divide(rs, denom, out=np.zeros_like(rs), where=denom > 0)[:, None]
+        X += alpha * p
+        r -= alpha * Ap
+        rs_new = np.einsum("ij,ij->i", r, r)
+        beta = np.divide(rs_new, rs, out=np.zeros_like(rs), where=rs > 0)[:, None]
+        p = r + beta * p
+        rs = rs_new
+    X[counts == 0] = 0.0
+    return X
+
+def _rmse(R, U: np.ndarray, V: np.ndarray, mean: float, chunk: int = 1_000_000) -> float:
+    coo = R.tocoo()
+    err = 0.0
+    for lo in range(0, coo.nnz, chunk):
+        r, c = coo.row[lo:lo + chunk], coo.col[lo:lo + chunk]
+        pred = np.einsum("ij,ij->i", U[r], V[c]) + mean
+        err += float(np.square(coo.data[lo:lo + chunk] - pred).sum())
+    return float(np.sqrt(err / coo.nnz)) if coo.nnz else 0.0
+
+class ALSModel:
+    """Explicit-feedback ALS (weighted-lambda regularization) over mean-centred ratings.
+
+    A user's scores for every item are one dense matrix-vector product,
+    `item_factors @ user_factors[u]`; items the user already rated are skipped.
+    """
+
+    def __init__(self, user_factors: np.ndarray, item_factors: np.ndarray, user_ids, item_ids, seen, meta: dict):
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.user_ids = np.asarray(user_ids, dtype=object)
+        self.item_ids = np.asarray(item_ids, dtype=object)
+        self.seen = seen
+        self.meta = meta
+        self._user_pos = None
+        self._item_index = None
+        self._item_unit = None
+
+    @property
+    def n_users(self) -> int:
+        return self.user_factors.shape[0]
+
+    @property
+    def n_items(self) -> int:
+        return self.item_factors.shape[0]
+
+    @classmethod
+    def build(cls, ratings: pd.DataFrame, factors: int = DEFAULT_FACTORS, reg: float = DEFAULT_REG,
+              iters: int = DEFAULT_ITERS, cg_steps: int = DEFAULT_CG_STEPS, seed: int = 0,
+              memory_mb: float = DEFAULT_MEMORY_MB, verbose: bool = False) -> "ALSModel":
+        R, user_ids, item_ids = build_interactions(ratings)
+        mean = float(R.data.mean()) if R.nnz else 0.0
+        Rc = R.copy()
+        Rc.data -= mean
+        RcT = Rc.T.tocsr()
+        rng = np.random.default_rng(seed)
+        V = (rng.standard_normal((R.shape[1], factors)) * 0.1).astype(np.float32)
+        U = np.zeros((R.shape[0], factors), dtype=np.float32)
+        for it in range(iters):
+            U = _solve_side(Rc, V, U, reg, cg_steps, memory_mb)
+            V = _solve_side(RcT, U, V, reg, cg_steps, memory_mb)
+            if verbose:
+                print(f"  iter {it + 1}/{iters}: train RMSE {_rmse(R, U, V, mean):.4f}")
+        meta = {"factors": factors, "reg": reg, "iters": iters, "cg_steps": cg_steps, "mean": mean, "n_users": R.shape[0],
+                "n_items": R.shape[1], "n_ratings": int(R.nnz), "train_rmse": _rmse(R, U, V, mean),
+                "built_at": time.time()}
+        return cls(U, V, user_ids, item_ids, R, meta)
+
+    def user_row(self, user_id) -> int | None:
+        if self._user_pos is None:
+            self._user_pos = {u: i for i, u in enumerate(self.user_ids.tolist())}
+        return self._user_pos.get(str(user_id))
+
+    def item_rows(self, ids) -> np.ndarray:
+        """Model rows of the given game ids (-1 for games without ratings)."""
+        if self._item_index is None:
+            self._item_index = pd.Index(self.item_ids)
+        return self._item_index.get_indexer(np.asarray(ids, dtype=object).astype(str))
+
+    def item_similarity(self, item_row: int, rows=None) -> np.ndarray:
+        """Cosine similarity of one item's factors to all items (or to `rows`)."""
+        if self._item_unit is None:
+            V = np.asarray(self.item_factors)
+            norms = np.linalg.norm(V, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._item_unit = (V / norms).astype(np.float32)
+        unit = self._item_unit if rows is None else self._item_unit[rows]
+        return unit @ self._item_unit[item_row]
+
+    def score(self, user_row: int) -> np.ndarray:
+        """Predicted rating of every item for one user."""
+        return np.asarray(self.item_factors) @ np.asarray(self.user_factors[user_row]) + self.meta.get("mean", 0.0)
+
+    def recommend(self, user_id, k: int = 10, exclude_seen: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """(item ids, predicted ratings) of the user's top-k unrated items, best first."""
+        u = self.user_row(user_id)
+        if u is None:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.float32)
+        scores = self.score(u).astype(np.float32, copy=False)
+        if exclude_seen:
+            scores[self.seen.indices[self.seen.indptr[u]:self.seen.indptr[u + 1]]] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return self.item_ids[top], scores[top]
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {"user_factors": self.user_factors, "item_factors": self.item_factors}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, user_ids, item_ids, seen, meta: dict) -> "ALSModel":
+        return cls(arrays["user_factors"], arrays["item_factors"], user_ids, item_ids, seen, meta)
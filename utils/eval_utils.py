@@ -0,0 +1,74 @@
+# utils/eval_utils.py — offline ranking metrics, held-out splits and latency / memory measurement
+from __future__ import annotations
+import time
+import tracemalloc
+from typing import Callable, Iterable
+import numpy as np
+import pandas as pd
+
+def split_ratings(ratings: pd.DataFrame, test_frac: float = 0.2, min_ratings: int = 5,
+                  seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Per-user random hold-out: users with at least `min_ratings` ratings lose
+    `test_frac` of them (at least one) to the test split."""
+    rng = np.random.default_rng(seed)
+    df = ratings.iloc[rng.permutation(len(ratings))]
+    users = df["user_id"].to_numpy()
+    codes, _ = pd.factorize(users)
+    counts = np.bincount(codes)
+    rank = df.groupby(codes, sort=False).cumcount().to_numpy()
+    n_test = np.where(counts >= min_ratings, np.maximum(1, (counts * test_frac).astype(np.int64)), 0)
+    is_test = rank < n_test[codes]
+    return df[~is_test].reset_index(drop=True), df[is_test].reset_index(drop=True)
+
+def ranking_metrics(recs: list, relevant: list, k: int) -> dict:
+    """Mean precision@k, recall@k and binary NDCG@k over users."""
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    prec, rec, ndcg = [], [], []
+    for got, want in zip(recs, relevant):
+        got = np.asarray(got, dtype=object)[:k]
+        hits = np.isin(got, np.asarray(want, dtype=object))
+        n_hit = int(hits.sum())
+        prec.append(n_hit / k)
+        rec.append(n_hit / len(want) if len(want) else 0.0)
+        ideal = discounts[:min(len(want), k)].sum()
+        ndcg.append(float(discounts[:len(got)][hits].sum() / ideal) if ideal else 0.0)
+    mean = lambda xs: float(np.mean(xs)) if xs else 0.0
+    return {f"precision@{k}": mean(prec), f"recall@{k}": mean(rec), f"ndcg@{k}": mean(ndcg)}
+
+def coverage(recs: Iterable, n_items: int) -> float:
+    """Share of the catalog that appears in at least one recommendation list."""
+    seen = set()
+    for r in recs:
+        seen.update(np.asarray(r, dtype=object).tolist())
+    return len(seen) / n_items if n_items else 0.0
+
+def latency_summary(seconds: list[float]) -> dict:
+    if not seconds:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "throughput_qps": 0.0}
+    ms = np.asarray(seconds) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+            "throughput_qps": float(len(ms) / max(ms.sum() / 1000.0, 1e-12))}
+
+def timed_calls(fn: Callable, inputs: list) -> tuple[list, list[float]]:
+    """Run fn on every input; returns (outputs, per-call wall seconds)."""
+    outputs, seconds = [], []
+    for x in inputs:
+        t0 = time.perf_counter()
+        outputs.append(fn(x))
+        seconds.append(time.perf_counter() - t0)
+    return outputs, seconds
+
+def peak_memory_mb(fn: Callable, inputs: list) -> float:
+    """Peak traced allocation (MB) while running fn on the inputs.
+
+    Kept apart from timed_calls because tracing allocations slows calls down.
+    """
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        for x in inputs:
+            fn(x)
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
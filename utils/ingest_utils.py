@@ -0,0 +1,155 @@
+# utils/ingest_utils.py — declared table schemas and vectorized coercion for CSV / DB ingestion
+#
+#   result = coerce(df, GAME_RATINGS)
+#   result.frame      # cleaned rows, schema column order, compact dtypes
+#   result.rejected   # offending input rows plus a "reason" column
+#   result.nulled     # per column: values present in the input but unparseable (set to null)
+from __future__ import annotations
+import os
+from typing import NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+class Column(NamedTuple):
+    name: str
+    kind: str                   # "int" (narrowest width) | "float" (float64) | "text" | "category"
+    required: bool = False      # rows where it is missing or unparseable are rejected
+    aliases: tuple = ()         # alternative header names, matched after strip().lower()
+
+class TableSchema(NamedTuple):
+    name: str
+    columns: tuple
+    key: tuple = ()             # duplicate keys keep the last row; earlier ones are reported
+
+    @property
+    def names(self) -> list[str]:
+        return [c.name for c in self.columns]
+
+class IngestResult(NamedTuple):
+    frame: pd.DataFrame
+    rejected: pd.DataFrame
+    nulled: dict
+
+GAME_METADATA = TableSchema("game_metadata", (
+    Column("game_id", "int", required=True, aliases=("id", "itemid", "item_id")),
+    Column("name", "text", aliases=("title", "game", "item_name", "title_name")),
+    Column("description", "text", aliases=("desc", "summary", "about", "details")),
+    Column("genres", "text"),
+    Column("platforms", "text"),
+    Column("rating", "float"),
+    Column("released", "text"),
+    Column("cover_image", "text"),
+    Column("game_link", "text"),
+), key=("game_id",))
+
+GAME_RATINGS = TableSchema("game_ratings", (
+    Column("game_id", "int", required=True),
+    Column("user_id", "text", required=True),
+    Column("rating", "int"),      # the table stores whole stars; fractions are truncated
+), key=("game_id", "user_id"))
+
+_INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+def _compact_int(values: np.ndarray, nullable: bool):
+    """Smallest signed integer dtype that holds the float64 values (pandas' nullable IntN when NaNs remain)."""
+    present = values[~np.isnan(values)]
+    lo, hi = (present.min(), present.max()) if len(present) else (0, 0)
+    dtype = next(t for t in _INT_DTYPES if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max)
+    if nullable and len(present) < len(values):
+        return pd.array(values, dtype=dtype.__name__.capitalize())
+    return values.astype(dtype)
+
+def _text(s: pd.Series) -> np.ndarray:
+    # strip each distinct value once: genres, platforms, links... repeat heavily
+    codes, uniques = pd.factorize(s.to_numpy(dtype=object))
+    clean = [str(v).strip() or None for v in uniques.tolist()]
+    clean.append(None)   # code -1 (null) picks the trailing None
+    return np.array(clean, dtype=object)[codes]
+
+def _source_columns(df: pd.DataFrame, schema: TableSchema) -> dict:
+    found = {}
+    for col in schema.columns:
+        found[col.name] = next((c for c in (col.name, *col.aliases) if c in df.columns), None)
+    return found
+
+def coerce(df: pd.DataFrame, schema: TableSchema) -> IngestResult:
+    """Normalize headers, coerce every column with vectorized ops, reject bad rows.
+
+    Text is stripped with empty strings as null (never the literal "nan"); ints
+    and floats go through pd.to_numeric(errors="coerce"); required columns that
+    are missing or unparseable reject the row. Raises ValueError when a required
+    column is absent from the header.
+    """
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    source = _source_columns(df, schema)
+    absent = [c.name for c in schema.columns if c.required and source[c.name] is None]
+    if absent:
+        raise ValueError(f"{schema.name}: missing required columns {absent}")
+
+    n = len(df)
+    ok = np.ones(n, dtype=bool)
+    reason = np.empty(n, dtype=object)
+    out, nulled = {}, {}
+    for col in schema.columns:
+        src = source[col.name]
+        if src is None:
+            values = np.full(n, np.nan if col.kind in ("int", "float") else None,
+                             dtype=np.float64 if col.kind in ("int", "float") else object)
+            bad = np.zeros(n, dtype=bool)
+        elif col.kind in ("int", "float"):
+            raw = df[src]
+            text = _text(raw) if raw.dtype == object or pd.api.types.is_string_dtype(raw.dtype) else raw.to_numpy()
+            values = np.asarray(pd.to_numeric(text, errors="coerce"), dtype=np.float64)
+            if col.kind == "int":
+                values = np.where(np.isfinite(values), np.trunc(values), np.nan)
+            bad = pd.notna(text) & np.isnan(values)
+        else:
+            values, bad = _text(df[src]), np.zeros(n, dtype=bool)
+        missing = pd.isna(values)
+        if col.required:
+            reason[ok & bad] = f"{col.name}: invalid"
+            reason[ok & missing & ~bad] = f"{col.name}: missing"
+            ok &= ~missing
+        elif bad.any():
+            nulled[col.name] = int(bad.sum())
+        out[col.name] = values
+
+    if schema.key:
+        keys = pd.DataFrame({k: out[k][ok] for k in schema.key})
+        dup = np.zeros(n, dtype=bool)
+        dup[np.flatnonzero(ok)[keys.duplicated(keep="last").to_numpy()]] = True
+        reason[dup] = "duplicate key (a later row wins)"
+        ok &= ~dup
+    keep = ok if not ok.all() else slice(None)
+
+    frame = {}
+    for col in schema.columns:
+        values = out[col.name][keep]
+        if col.kind == "int":
+            values = _compact_int(values, nullable=not col.required)
+        elif col.kind == "category":
+            values = pd.Categorical(values)
+        frame[col.name] = values
+    rejected = df.iloc[np.flatnonzero(~ok)].assign(reason=reason[~ok]).reset_index(drop=True)
+    return IngestResult(pd.DataFrame(frame, copy=False), rejected, nulled)
+
+def to_params(frame: pd.DataFrame, columns: Optional[list] = None) -> np.ndarray:
+    """Row-major object array of DB-API parameters: Python scalars, None for nulls."""
+    cols = [frame[c].astype(object).where(frame[c].notna(), None) for c in (columns or list(frame.columns))]
+    return np.column_stack(cols) if len(frame) else np.empty((0, len(cols)), dtype=object)
+
+def summarize(result: IngestResult) -> str:
+    parts = [f"{len(result.frame):,} rows kept", f"{len(result.rejected):,} rejected"]
+    if len(result.rejected):
+        counts = result.rejected["reason"].value_counts()
+        parts.append("(" + ", ".join(f"{r}: {c:,}" for r, c in counts.items()) + ")")
+    if result.nulled:
+        parts.append("unparseable -> null: " + ", ".join(f"{c} {k:,}" for c, k in result.nulled.items()))
+    return " ".join(parts)
+
+def write_rejects(rejected: pd.DataFrame, path: str, append: bool = False):
+    """Append-friendly CSV report of rejected rows (with their reason)."""
+    if rejected.empty and append:
+        return
+    header = not (append and os.path.exists(path))
+    rejected.to_csv(path, mode="a" if append else "w", header=header, index=False)
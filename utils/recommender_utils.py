@@ -1,122 +1,339 @@
 from __future__ import annotations
-import os, sys, types, pickle
+import time, hashlib
 from typing import Any
 import numpy as np
 import pandas as pd
 import streamlit as st
+from utils.similarity_utils import DEFAULT_MEMORY_MB, blocked_topk
+from utils.artifact_utils import ArtifactError, read_artifact, write_artifact
 
-def _try_joblib_load(path: str):
-    import joblib
-    return joblib.load(path)
+CB_ARTIFACT_KIND = "cb-index"
+CB_TFIDF_PARAMS = {"ngram_range": (1, 2), "min_df": 2, "max_df": 0.95}
 
-def _try_pickle_load(path: str):
-    with open(path, "rb") as f:
-        return pickle.load(f)
+def catalog_fingerprint(games: pd.DataFrame, text_col: str = "combined_text") -> str:
+    cols = [c for c in ("id", "title", text_col) if c in games.columns]
+    frame = games[cols].astype({"id": str}) if "id" in cols else games[cols]   # int or str ids hash alike
+    h = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return hashlib.sha1(h.tobytes()).hexdigest()[:16]
 
-class _ModuleAliasUnpickler(pickle.Unpickler):
-    CLASS_MAP = {("main", "ContentBasedRecommender"): type("ContentBasedRecommender", (object,), {})}
-    def find_class(self, module, name):
-        key = (module, name)
-        if key in self.CLASS_MAP:
-            return self.CLASS_MAP[key]
-        return super().find_class(module, name)
+def build_cb_index(games: pd.DataFrame, text_col: str = "combined_text", **tfidf_params) -> dict:
+    """Fit the CB TF-IDF model once; rows of `matrix` follow the catalog row order.
 
-def _try_pickle_with_alias(path: str):
-    with open(path, "rb") as f:
-        return _ModuleAliasUnpickler(f).load()
+    Rows are L2-normalized (TfidfVectorizer's default), so a dot product of
+    two rows is their cosine similarity.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    params = {**CB_TFIDF_PARAMS, **tfidf_params}
+    if text_col not in games.columns:
+        text_col = "genres"
+    vec = TfidfVectorizer(dtype=np.float32, **params)
+    X = vec.fit_transform(games[text_col].fillna("").astype(str))
+    return {
+        "built_at": time.time(),
+        "params": {"text_col": text_col, **params},
+        "catalog_fingerprint": catalog_fingerprint(games, text_col),
+        "vectorizer": vec,
+        "matrix": X.tocsr(),
+        "ids": games["id"].astype(str).tolist(),
+    }
+
+def save_cb_index(index: dict, path: str, neighbors: "NeighborTable | None" = None, ann=None) -> dict:
+    """Write the index (and optional neighbour table / ANN index) as one artifact."""
+    vec = index["vectorizer"]
+    arrays = {"idf": np.asarray(vec.idf_, dtype=np.float32)}
+    meta = {}
+    if neighbors is not None:
+        arrays.update({"neighbors.ids": neighbors.ids, "neighbors.scores": neighbors.scores})
+        meta["neighbors"] = neighbors.meta
+    if ann is not None:
+        arrays.update({f"ann.{k}": v for k, v in ann.arrays().items()})
+        meta["ann"] = ann.meta
+    params = {k: (list(v) if isinstance(v, tuple) else v) for k, v in index["params"].items()}
+    return write_artifact(
+        path, CB_ARTIFACT_KIND,
+        arrays=arrays,
+        sparse={"matrix": index["matrix"]},
+        texts={"vocabulary": vec.get_feature_names_out().tolist(), "ids": index["ids"]},
+        params=params,
+        catalog_fingerprint=index["catalog_fingerprint"],
+        meta=meta,
+    )
 
 @st.cache_resource(show_spinner=False)
-def load_cb_model(path: str):
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Không tìm thấy CB model tại: {path}")
-    if "main" not in sys.modules:
-        fake_main = types.ModuleType("main")
-        class ContentBasedRecommender: pass
-        fake_main.ContentBasedRecommender = ContentBasedRecommender
-        sys.modules["main"] = fake_main
-    errors = []
-    for fn in (_try_joblib_load, _try_pickle_load, _try_pickle_with_alias):
-        try:
-            return fn(path)
-        except Exception as e:
-            errors.append(f"{fn.__name__}: {e}")
-    return None
-
-def _build_fallback_cb_matrix(games: pd.DataFrame):
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    texts = games["genres"].fillna("").astype(str).tolist()
-    vec = TfidfVectorizer(ngram_range=(1, 2), min_df=1, max_df=0.95)
-    X = vec.fit_transform(texts)
-    sim = cosine_similarity(X)
-    title_to_idx = {t: i for i, t in enumerate(games["title"].fillna("").astype(str).tolist())}
-    return {"vectorizer": vec, "matrix": X, "cosine": sim, "title_to_idx": title_to_idx}
-
-def _infer_cb_structure(model: Any):
-    out = {"matrix": None, "cosine": None, "title_to_idx": None, "nn": None, "vectorizer": None}
-    if isinstance(model, dict):
-        out["matrix"] = model.get("matrix") or model.get("X") or model.get("tfidf")
-        out["cosine"] = model.get("cosine")
-        out["title_to_idx"] = model.get("title_to_idx") or model.get("indices")
-        out["nn"] = model.get("nn")
-        out["vectorizer"] = model.get("vectorizer")
-        return out
-    if isinstance(model, (list, tuple)):
-        if len(model) >= 2:
-            out["vectorizer"], out["matrix"] = model[0], model[1]
-        if len(model) >= 3 and isinstance(model[2], dict):
-            out["title_to_idx"] = model[2]
-        if len(model) >= 4:
-            out["cosine"] = model[3]
+def load_cb_model(path: str, expect_fingerprint: str | None = None, stamp: float | None = None) -> dict:
+    """Open a CB artifact zero-copy; raises ArtifactError if it does not fit this catalog.
+
+    `stamp` (the manifest mtime) only keys the cache so a rebuilt artifact is reloaded.
+    """
+    from utils.ann_utils import IVFIndex
+    art = read_artifact(path, CB_ARTIFACT_KIND, expect_fingerprint)
+    model = {
+        "built_at": art.manifest["created_at"],
+        "params": art.params,
+        "catalog_fingerprint": art.fingerprint,
+        "matrix": art.sparse("matrix"),
+        "ids": art.text("ids"),
+        "artifact": art,
+    }
+    if art.has("neighbors.ids"):
+        model["neighbors"] = NeighborTable(art.array("neighbors.ids"), art.array("neighbors.scores"),
+                                           art.meta.get("neighbors", {}))
+    if art.has("ann.vectors"):
+        names = ("vectors", "centroids", "list_offsets", "list_rows")
+        model["nn"] = IVFIndex.from_arrays({k: art.array(f"ann.{k}") for k in names}, art.meta.get("ann", {}))
+    return model
+
+BATCH_MEMORY_BUDGET = 256 * 1024 * 1024  # bytes of dense similarity rows per chunk
+# per (seed, row) pair: the float32 product, its negation and argpartition's int64 output
+_BATCH_BYTES_PER_PAIR = 16
+
+def _top_k(scores: np.ndarray, k: int, exclude: int | None = None) -> np.ndarray:
+    """Positions of the k best scores, best first, in O(n) + O(k log k)."""
+    if exclude is not None:
+        scores[exclude] = -np.inf
+    k = min(k, len(scores) - (exclude is not None))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+def _cb_matrix(model: Any, n_rows: int | None = None):
+    X = model.get("matrix") if isinstance(model, dict) else None
+    if X is None or (n_rows is not None and X.shape[0] != n_rows):
+        return None
+    return X
+
+def score_cb_batch(model: Any, seed_rows, topn: int = 10) -> tuple[np.ndarray, np.ndarray]:
+    """Top-n neighbours of many seeds at once.
+
+    Returns (rows, scores), both shaped (len(seed_rows), topn). Each chunk
+    of seeds costs one sparse matrix product. Missing slots hold -1 and NaN.
+    """
+    X = _cb_matrix(model)
+    if X is None:
+        raise ValueError("CB model has no feature matrix")
+    X = X.tocsr()
+    seeds = np.asarray(seed_rows, dtype=np.int64)
+    n = X.shape[0]
+    k = max(0, min(topn, n - 1))
+    rows = np.full((len(seeds), topn), -1, dtype=np.int64)
+    scores = np.full((len(seeds), topn), np.nan, dtype=np.float32)
+    if not len(seeds) or k == 0:
+        return rows, scores
+    XT = X.T.tocsc()
+    chunk = max(1, BATCH_MEMORY_BUDGET // (n * _BATCH_BYTES_PER_PAIR))
+    for lo in range(0, len(seeds), chunk):
+        s = seeds[lo:lo + chunk]
+        sim = (X[s] @ XT).astype(np.float32, copy=False).toarray()
+        sim[np.arange(len(s)), s] = -np.inf
+        part = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(sim, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        rows[lo:lo + len(s), :k] = np.take_along_axis(part, order, axis=1)
+        scores[lo:lo + len(s), :k] = np.take_along_axis(part_scores, order, axis=1)
+    return rows, scores
+
+def get_cb_recommendations_batch(model: Any, seed_ids, topn: int = 10) -> tuple[np.ndarray, np.ndarray]:
+    """Like score_cb_batch but keyed by game id; returns (ids, scores) with None for gaps."""
+    ids = np.asarray(model["ids"], dtype=object)
+    pos = {gid: i for i, gid in enumerate(ids.tolist())}
+    seed_rows = np.array([pos.get(str(g), -1) for g in seed_ids], dtype=np.int64)
+    known = seed_rows >= 0
+    out_ids = np.full((len(seed_rows), topn), None, dtype=object)
+    out_scores = np.full((len(seed_rows), topn), np.nan, dtype=np.float32)
+    rows, scores = score_cb_batch(model, seed_rows[known], topn)
+    hit = rows >= 0
+    out_ids[known] = np.where(hit, ids[np.where(hit, rows, 0)], None)
+    out_scores[known] = scores
+    return out_ids, out_scores
+
+NEIGHBOR_K = 50
+
+class NeighborTable:
+    """Top-K content neighbours per catalog row: ids (int32, -1 = empty) and scores."""
+
+    def __init__(self, ids: np.ndarray, scores: np.ndarray, meta: dict):
+        self.ids = ids
+        self.scores = scores
+        self.meta = meta
+
+    @property
+    def n_rows(self) -> int:
+        return self.ids.shape[0]
+
+    @property
+    def k(self) -> int:
+        return self.ids.shape[1]
+
+    @property
+    def fingerprint(self) -> str | None:
+        return self.meta.get("catalog_fingerprint")
+
+    def lookup(self, row: int, topn: int) -> tuple[np.ndarray, np.ndarray]:
+        ids = np.asarray(self.ids[row, :topn])
+        keep = ids >= 0
+        return ids[keep].astype(np.int64), np.asarray(self.scores[row, :topn], dtype=np.float32)[keep]
+
+def build_neighbor_table(model: Any, k: int = NEIGHBOR_K, score_dtype=np.float16,
+                         memory_mb: float = DEFAULT_MEMORY_MB, n_jobs: int = 1) -> NeighborTable:
+    X = _cb_matrix(model)
+    ids, scores = blocked_topk(X, k=k, memory_mb=memory_mb, n_jobs=n_jobs, score_dtype=score_dtype)
+    meta = {"k": k, "n_rows": X.shape[0], "score_dtype": np.dtype(score_dtype).name, "built_at": time.time()}
+    if isinstance(model, dict) and "catalog_fingerprint" in model:
+        meta["catalog_fingerprint"] = model["catalog_fingerprint"]
+    return NeighborTable(ids, scores, meta)
+
+def _seed_position(games: pd.DataFrame, seed_title: str, keys=None) -> int | None:
+    """Row position of the seed; hashed through a catalog KeyIndex when one is given."""
+    if keys is not None:
+        return keys.title_row(seed_title)
+    titles = games["title"] if "title" in games.columns else games["id"].astype(str)
+    matches = np.flatnonzero(titles.to_numpy() == seed_title)
+    return int(matches[0]) if len(matches) else None
+
+def _cb_features(model: Any, games: pd.DataFrame, text_col: str):
+    X = _cb_matrix(model, len(games))
+    if X is None:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        if text_col not in games.columns:
+            text_col = "genres"
+        X = TfidfVectorizer(**CB_TFIDF_PARAMS).fit_transform(games[text_col].fillna("").astype(str))
+    return X.tocsr()
+
+def _neighbor_table(model: Any, games: pd.DataFrame) -> NeighborTable | None:
+    table = model.get("neighbors") if isinstance(model, dict) else None
+    return table if table is not None and table.n_rows == len(games) else None
+
+def _cb_neighbors(model: Any, games: pd.DataFrame, seed_pos: int, topn: int, text_col: str):
+    table = _neighbor_table(model, games)
+    if table is not None and topn <= table.k:
+        return table.lookup(seed_pos, topn)
+    nn = model.get("nn") if isinstance(model, dict) else None
+    if nn is not None and hasattr(nn, "query") and nn.n_rows == len(games):
+        return nn.query(seed_pos, topn)
+    X = _cb_features(model, games, text_col)
+    sim = (X @ X[seed_pos].T).toarray().ravel()   # rows are L2-normalized: dot product = cosine
+    order = _top_k(sim, topn, exclude=seed_pos)
+    return order, sim[order]
+
+def get_cb_recommendations(model: Any, games: pd.DataFrame, seed_title: str, topn: int = 10, text_col: str = "genres",
+                           keys=None) -> pd.DataFrame:
+    if games is None or games.empty:
+        return pd.DataFrame()
+    seed_pos = _seed_position(games, seed_title, keys)
+    if seed_pos is None:
+        return pd.DataFrame()
+    rows, scores = _cb_neighbors(model, games, seed_pos, topn, text_col)
+    rec = games.iloc[rows].copy()
+    rec["score"] = scores
+    return rec
+
+def _positions_of(games: pd.DataFrame, ids, keys=None) -> np.ndarray:
+    """Catalog positions of game ids (-1 if absent), through the catalog's KeyIndex.
+
+    Without `keys` an index is built for this call, which hashes every id:
+    callers serving requests should pass the per-version catalog.keys.
+    """
+    if keys is None:
+        from catalog.keys import KeyIndex
+        keys = KeyIndex.build(games)
+    return keys.rows_of(ids)
+
+HYBRID_WEIGHTS = {"cb": 0.6, "cf": 0.4}
+HYBRID_CANDIDATES = 100
+
+def _normalize_scores(x: np.ndarray, how: str = "minmax") -> np.ndarray:
+    """Rescale finite entries to a comparable range; NaNs stay NaN."""
+    out = np.full_like(x, np.nan, dtype=np.float32)
+    ok = np.isfinite(x)
+    if not ok.any():
         return out
-    for attr in ["tfidf_matrix", "matrix", "X", "features_", "embeddings_"]:
-        if hasattr(model, attr):
-            out["matrix"] = getattr(model, attr)
-            break
-    for attr in ["cosine_", "cosine", "sims_"]:
-        if hasattr(model, attr):
-            out["cosine"] = getattr(model, attr)
-            break
-    for attr in ["title_to_idx", "indices_", "name_to_idx_"]:
-        if hasattr(model, attr):
-            out["title_to_idx"] = getattr(model, attr)
-            break
-    for attr in ["nn", "knn_", "neighbors_"]:
-        if hasattr(model, attr):
-            out["nn"] = getattr(model, attr)
-            break
-    for attr in ["vectorizer", "tfidf_", "vectorizer_"]:
-        if hasattr(model, attr):
-            out["vectorizer"] = getattr(model, attr)
-            break
+    v = x[ok]
+    if how == "zscore":
+        sd = v.std()
+        out[ok] = (v - v.mean()) / sd if sd > 0 else 0.0
+    else:
+        span = v.max() - v.min()
+        out[ok] = (v - v.min()) / span if span > 0 else 1.0
     return out
 
-def get_cb_recommendations(model: Any, games: pd.DataFrame, seed_title: str, topn: int = 10, text_col: str = "genres") -> pd.DataFrame:
+def get_hybrid_recommendations(cb_model: Any, cf_model, games: pd.DataFrame, seed_title: str, topn: int = 10,
+                               weights: dict | None = None, norm: str = "minmax",
+                               n_candidates: int = HYBRID_CANDIDATES, text_col: str = "combined_text",
+                               keys=None) -> pd.DataFrame:
+    """Blend content similarity with CF item-factor similarity over a candidate set.
+
+    Candidates are the seed's top content neighbours (at most the neighbour
+    table's k, so they come from the table) plus its top CF neighbours. Both signals are normalized over the candidates and mixed
+    with `weights`; games without ratings keep their content score alone.
+    Without a CF model, or for an unrated seed, this is plain CB.
+    """
     if games is None or games.empty:
         return pd.DataFrame()
-    g = games.copy()
-    if "title" not in g.columns:
-        g["title"] = g["id"].astype(str)
-    if text_col not in g.columns:
-        text_col = "genres"
-    g[text_col] = g[text_col].fillna("").astype(str)
-    try:
-        seed_idx = g.index[g["title"] == seed_title][0]
-    except Exception:
+    seed_pos = _seed_position(games, seed_title, keys)
+    if seed_pos is None:
         return pd.DataFrame()
-    info = _infer_cb_structure(model) if model is not None else {}
-    if info.get("matrix") is not None and info.get("vectorizer") is not None:
-        from sklearn.metrics.pairwise import cosine_similarity
-        X = info["matrix"]
-        sim = cosine_similarity(X[seed_idx], X).ravel()
-    else:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
-        vect = TfidfVectorizer(ngram_range=(1,2), min_df=2, max_df=0.95)
-        X = vect.fit_transform(g[text_col])
-        sim = cosine_similarity(X[seed_idx], X).ravel()
-    order = np.argsort(sim)[::-1]
-    order = [i for i in order if i != seed_idx][:topn]
-    rec = g.iloc[order].copy()
-    rec["score"] = sim[order]
+    seed_item = cf_model.item_rows([games["id"].iat[seed_pos]])[0] if cf_model is not None else -1
+    if seed_item < 0:
+        return get_cb_recommendations(cb_model, games, seed_title, topn, text_col, keys)
+
+    w = {**HYBRID_WEIGHTS, **(weights or {})}
+    total = (w["cb"] + w["cf"]) or 1.0
+    w_cb, w_cf = w["cb"] / total, w["cf"] / total
+
+    table = _neighbor_table(cb_model, games)
+    n_cb = min(n_candidates, table.k) if table is not None else n_candidates
+    cb_rows, _ = _cb_neighbors(cb_model, games, seed_pos, n_cb, text_col)
+    cf_sim = cf_model.item_similarity(seed_item)
+    cf_top = _top_k(cf_sim.copy(), n_candidates, exclude=seed_item)
+    cf_rows = _positions_of(games, cf_model.item_ids[cf_top], keys)
+    cand = np.unique(np.concatenate([np.asarray(cb_rows, dtype=np.int64), cf_rows]))
+    cand = cand[(cand >= 0) & (cand != seed_pos)]
+
+    X = _cb_features(cb_model, games, text_col)
+    cb = (X[cand] @ X[seed_pos].T).toarray().ravel()
+    items = cf_model.item_rows(games["id"].to_numpy()[cand])
+    cf = np.full(len(cand), np.nan, dtype=np.float32)
+    cf[items >= 0] = cf_sim[items[items >= 0]]
+
+    cb_n, cf_n = _normalize_scores(cb, norm), _normalize_scores(cf, norm)
+    fused = np.where(np.isnan(cf_n), cb_n, w_cb * cb_n + w_cf * cf_n)
+    order = _top_k(fused, topn)
+    rec = games.iloc[cand[order]].copy()
+    rec["score"] = fused[order]
+    rec["cb_score"] = cb[order]
+    rec["cf_score"] = cf[order]
+    return rec
+
+CF_ARTIFACT_KIND = "cf-als"
+
+def save_cf_model(model, path: str) -> dict:
+    """Write a trained ALSModel (factors, id maps and the rated-items matrix) as an artifact."""
+    return write_artifact(
+        path, CF_ARTIFACT_KIND,
+        arrays=model.arrays(),
+        sparse={"seen": model.seen},
+        texts={"user_ids": model.user_ids.tolist(), "item_ids": model.item_ids.tolist()},
+        params={k: model.meta[k] for k in ("factors", "reg", "iters", "cg_steps")},
+        meta=model.meta,
+    )
+
+@st.cache_resource(show_spinner=False)
+def load_cf_model(path: str, stamp: float | None = None):
+    """Open a CF artifact zero-copy; `stamp` (the manifest mtime) only keys the cache."""
+    from utils.cf_utils import ALSModel
+    art = read_artifact(path, CF_ARTIFACT_KIND)
+    arrays = {k: art.array(k) for k in ("user_factors", "item_factors")}
+    return ALSModel.from_arrays(arrays, art.text("user_ids"), art.text("item_ids"), art.sparse("seen"), art.meta)
+
+def get_cf_recommendations(model, games: pd.DataFrame, user_id: str, topn: int = 10, keys=None) -> pd.DataFrame:
+    """Top-n catalog games for a user from the CF model; empty for unknown users."""
+    if model is None or games is None or games.empty:
+        return pd.DataFrame()
+    # over-fetch a little: rated games may have left the catalog since training
+    item_ids, scores = model.recommend(user_id, topn * 2)
+    pos = _positions_of(games, item_ids, keys)
+    keep = pos >= 0
+    rec = games.iloc[pos[keep][:topn]].copy()
+    rec["score"] = scores[keep][:topn]
     return rec
@@ -0,0 +1,72 @@
+# utils/similarity_utils.py — blocked top-K cosine similarity under a memory budget
+from __future__ import annotations
+import numpy as np
+
+DEFAULT_MEMORY_MB = 512
+# Bytes held per (row, column) pair of a block: the float32 product, its
+# row-major copy, the negation argpartition sorts and argpartition's int64
+# output. Each block row also densifies its feature vector (4 bytes per term).
+_BYTES_PER_PAIR = 20
+
+_worker_state: dict = {}
+
+def _l2_normalize(X):
+    from sklearn.preprocessing import normalize
+    return normalize(X.tocsr().astype(np.float32), norm="l2", copy=True)
+
+def block_rows(n_rows: int, n_terms: int, memory_mb: float = DEFAULT_MEMORY_MB) -> int:
+    per_row = n_rows * _BYTES_PER_PAIR + n_terms * 4
+    return max(1, int(memory_mb * 1024 * 1024) // per_row)
+
+def _topk_block(Xn, lo: int, hi: int, k: int, exclude_self: bool):
+    # sparse @ dense is several times faster than sparse @ sparse here
+    sim = np.ascontiguousarray((Xn @ Xn[lo:hi].toarray().T).T)
+    if exclude_self:
+        sim[np.arange(hi - lo), np.arange(lo, hi)] = -np.inf
+    kk = min(k, sim.shape[1] - exclude_self)
+    ids = np.full((hi - lo, k), -1, dtype=np.int32)
+    scores = np.zeros((hi - lo, k), dtype=np.float32)
+    if kk <= 0:
+        return lo, ids, scores
+    part = np.argpartition(-sim, kk - 1, axis=1)[:, :kk]
+    part_scores = np.take_along_axis(sim, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    ids[:, :kk] = np.take_along_axis(part, order, axis=1)
+    scores[:, :kk] = np.take_along_axis(part_scores, order, axis=1)
+    return lo, ids, scores
+
+def _init_worker(Xn, k, exclude_self):
+    _worker_state.update(Xn=Xn, k=k, exclude_self=exclude_self)
+
+def _run_block(bounds):
+    w = _worker_state
+    return _topk_block(w["Xn"], bounds[0], bounds[1], w["k"], w["exclude_self"])
+
+def blocked_topk(X, k: int = 50, memory_mb: float = DEFAULT_MEMORY_MB, n_jobs: int = 1,
+                 exclude_self: bool = True, score_dtype=np.float32) -> tuple[np.ndarray, np.ndarray]:
+    """Top-k cosine neighbours of every row of sparse X without an N x N matrix.
+
+    Rows are streamed in blocks sized so one block stays within `memory_mb`
+    (per worker when n_jobs > 1). Returns (ids int32, scores) of shape (N, k);
+    empty slots hold -1 / 0.
+    """
+    Xn = _l2_normalize(X)
+    n = Xn.shape[0]
+    step = block_rows(n, Xn.shape[1], memory_mb)
+    bounds = [(lo, min(n, lo + step)) for lo in range(0, n, step)]
+    ids = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=score_dtype)
+    if n_jobs and n_jobs > 1 and len(bounds) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(Xn, k, exclude_self)) as pool:
+            results = pool.map(_run_block, bounds)
+            for lo, b_ids, b_scores in results:
+                ids[lo:lo + len(b_ids)] = b_ids
+                scores[lo:lo + len(b_ids)] = b_scores
+    else:
+        for lo, hi in bounds:
+            _, b_ids, b_scores = _topk_block(Xn, lo, hi, k, exclude_self)
+            ids[lo:hi] = b_ids
+            scores[lo:hi] = b_scores
+    return ids, scores
@@ -0,0 +1,84 @@
+# utils/synthetic_utils.py — synthetic catalog and ratings for offline evaluation / benchmarks
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+GENRES = ["Action", "Adventure", "RPG", "Shooter", "Indie", "Puzzle", "Strategy", "Racing",
+          "Simulation", "Sports", "Platformer", "Horror", "Fighting", "Casual", "Arcade", "Family"]
+PLATFORMS = ["PC", "PlayStation 4", "PlayStation 5", "Xbox One", "Xbox Series S/X", "Nintendo Switch",
+             "iOS", "Android", "macOS", "Linux"]
+THEMES = ("zombie survival co-op space pirate dragon racing puzzle farm city build dungeon magic "
+          "sword stealth robot alien galaxy kingdom castle island ocean desert forest jungle ninja "
+          "samurai cyberpunk detective mystery haunted wizard knight tank pilot soccer basketball "
+          "cards chess tower defense sandbox crafting villain hero quest loot arena battle royale "
+          "rhythm music cooking pet horse western medieval viking future").split()
+
+N_TOPICS = 24
+
+def _topics(rng: np.random.Generator):
+    genres = np.array([rng.choice(len(GENRES), 2, replace=False) for _ in range(N_TOPICS)])
+    themes = np.array([rng.choice(len(THEMES), 8, replace=False) for _ in range(N_TOPICS)])
+    return genres, themes
+
+def synthetic_catalog(n_items: int, seed: int = 0, desc_words: int = 16) -> pd.DataFrame:
+    """Raw game_metadata-shaped frame; each game belongs to one latent topic
+    that drives its genres and description words (Zipf-like topic sizes)."""
+    rng = np.random.default_rng(seed)
+    topic_genres, topic_themes = _topics(rng)
+    popularity = 1.0 / np.arange(1, N_TOPICS + 1)
+    topic = rng.choice(N_TOPICS, n_items, p=popularity / popularity.sum())
+
+    themes = np.asarray(THEMES, dtype=object)
+    on_topic = rng.random((n_items, desc_words)) < 0.75
+    words = np.where(on_topic, topic_themes[topic[:, None], rng.integers(0, 8, (n_items, desc_words))],
+                     rng.integers(0, len(THEMES), (n_items, desc_words)))
+    desc = ["<p>" + " ".join(r) + "</p>" for r in themes[words].tolist()]
+    genre_names = np.asarray(GENRES, dtype=object)
+    genres = [f"{a}, {b}" for a, b in genre_names[topic_genres[topic]].tolist()]
+    plats = np.asarray(PLATFORMS, dtype=object)[rng.integers(0, len(PLATFORMS), (n_items, 2))]
+    ids = np.arange(1, n_items + 1)
+    first = themes[topic_themes[topic, 0]]
+    return pd.DataFrame({
+        "id": ids.astype(str),
+        "title": [f"{t.title()} {i}" for t, i in zip(first.tolist(), ids.tolist())],
+        "genres": genres,
+        "platforms": [f"{a}, {b}" if a != b else a for a, b in plats.tolist()],
+        "description": desc,
+        "rating": np.round(rng.random(n_items) * 5, 2),
+        "released": (pd.Timestamp("2000-01-01") + pd.to_timedelta(rng.integers(0, 9000, n_items), unit="D"))
+                    .strftime("%Y-%m-%d"),
+        "cover_image": "",
+        "game_link": "",
+        "topic": topic,
+    })
+
+def synthetic_ratings(games: pd.DataFrame, n_users: int, mean_ratings: float = 20.0,
+                      seed: int = 0) -> pd.DataFrame:
+    """game_ratings-shaped frame: each user likes one or two topics, rates mostly
+    (popular) games from them highly and a random remainder low."""
+    rng = np.random.default_rng(seed + 1)
+    topic = games["topic"].to_numpy()
+    n_items = len(games)
+    counts = np.maximum(1, rng.geometric(1.0 / mean_ratings, n_users))
+    user = np.repeat(np.arange(n_users), counts)
+    likes = rng.integers(0, N_TOPICS, (n_users, 2))
+    single = rng.random(n_users) < 0.5
+    likes[single, 1] = likes[single, 0]
+
+    by_topic = np.argsort(topic, kind="stable")
+    starts = np.searchsorted(topic[by_topic], np.arange(N_TOPICS + 1))
+    sizes = np.diff(starts)
+    pick_topic = likes[user, rng.integers(0, 2, len(user))]
+    # popularity inside a topic is skewed towards its first games
+    offset = np.floor(sizes[pick_topic] * rng.random(len(user)) ** 2).astype(np.int64)
+    liked_item = by_topic[np.minimum(starts[pick_topic] + offset, n_items - 1)]
+    on_topic = (rng.random(len(user)) < 0.7) & (sizes[pick_topic] > 0)
+    item = np.where(on_topic, liked_item, rng.integers(0, n_items, len(user)))
+
+    liked = (topic[item] == likes[user, 0]) | (topic[item] == likes[user, 1])
+    rating = np.clip(np.where(liked, 4.3, 2.2) + rng.normal(0, 0.8, len(user)), 1, 5).round()
+    df = pd.DataFrame({"game_id": games["id"].to_numpy()[item].astype(np.int64), "user_id": user, "rating": rating})
+    df = df.drop_duplicates(["user_id", "game_id"], keep="last")
+    df["user_id"] = ("user" + df["user_id"].astype(str)).astype("category")
+    df["rating"] = df["rating"].astype(np.float32)
+    return df.reset_index(drop=True)